@@ -2,672 +2,582 @@
 Construction Drawing Symbol Recognition - All Trades
 Teaching AI to identify equipment by visual symbols, labels, and context
 NOT by position or assumptions
+
+The symbol tables live in data/construction_symbols/<NAME>.json and the
+identification rules in IDENTIFICATION_RULES.txt beside them. Both are read on
+first access (PEP 562 module __getattr__), as are the label indexes derived
+from the tables, so importing this module is cheap.
 """
 
-# ═══════════════════════════════════════════════════════════════
-# ELECTRICAL SYMBOLS & IDENTIFICATION
-# ═══════════════════════════════════════════════════════════════
+import enum
+import functools
+import json
+import logging
+import pathlib
+import re
+import sys
+import types
+from dataclasses import dataclass
+from typing import Tuple, Union
 
-ELECTRICAL_SYMBOLS = {
-    "equipment": {
-        "switchboard": {
-            "symbols": [
-                "Large rectangle with diagonal lines inside",
-                "Rectangle with vertical bars/sections",
-                "Box with 'SB' or 'SWBD' label"
-            ],
-            "labels": ["SWITCHBOARD", "MSB", "SWBD", "SB", "MAIN SWITCHBOARD", "ESB", "DSB"],
-            "characteristics": [
-                "Multiple feeders leaving (3+ lines exiting)",
-                "Large incoming feeder (250+ kcmil typical)",
-                "Ground wire #1/0 or larger",
-                "Rating 400A-4000A typical"
-            ],
-            "context_clues": [
-                "Fed by service entrance or transformer",
-                "Distributes to multiple panels",
-                "Often has 'MAIN' in label"
-            ]
-        },
-        
-        "switchgear": {
-            "symbols": [
-                "Large rectangle with sections/compartments drawn",
-                "Multiple vertical divisions inside rectangle"
-            ],
-            "labels": ["SWITCHGEAR", "SWGR", "MAIN SWITCHGEAR", "MSG"],
-            "characteristics": [
-                "Very large incoming feeder (500+ kcmil)",
-                "Multiple large outgoing feeders",
-                "Rating 1000A-4000A+ typical",
-                "May show bus bars graphically"
-            ]
-        },
-        
-        "panelboard": {
-            "symbols": [
-                "Smaller rectangle",
-                "Rectangle with circuit lines inside",
-                "Box with panel designation"
-            ],
-            "labels": ["PP-1", "LP-1", "RP-1", "PANEL", "PANELBOARD", "MDP", "DP"],
-            "label_patterns": [
-                "PP-# (Power Panel)",
-                "LP-# (Lighting Panel)",
-                "RP-# (Receptacle Panel)",
-                "DP-# (Distribution Panel)",
-                "MDP (Main Distribution Panel)"
-            ],
-            "characteristics": [
-                "Fed by feeder (#1/0 to 500 kcmil typical)",
-                "Feeds branch circuits (#12, #14)",
-                "Rating 100A-400A typical",
-                "Single feeder in, multiple circuits out"
-            ]
-        },
-        
-        "transformer": {
-            "symbols": [
-                "Two circles side by side with coils",
-                "Circle with 'T' inside",
-                "Rectangle with transformer windings drawn",
-                "Two parallel vertical lines (schematic)"
-            ],
-            "labels": ["XFMR", "TRANSFORMER", "T-1", "TRANS", "DRY TYPE TRANSFORMER"],
-            "characteristics": [
-                "Shows primary voltage (input)",
-                "Shows secondary voltage (output)",
-                "kVA rating (45kVA, 75kVA, 112.5kVA, etc.)",
-                "May show % impedance",
-                "Voltage step-down or step-up notation (480V → 208V)"
-            ],
-            "context_clues": [
-                "Fed from high voltage (480V, 4160V)",
-                "Feeds low voltage (208V, 240V)",
-                "Shows delta or wye connections"
-            ]
-        },
-        
-        "disconnect": {
-            "symbols": [
-                "Square with diagonal line (open switch)",
-                "Box with 'DS' or 'DISC'",
-                "Rectangle with switch symbol"
-            ],
-            "labels": ["DS", "DISCONNECT", "DISC", "SAFETY SWITCH", "FUSED DISCONNECT"],
-            "characteristics": [
-                "Amperage rating (30A, 60A, 100A, 200A, etc.)",
-                "Fused or non-fused",
-                "NEMA type (1, 3R, 4X, etc.)",
-                "Located before equipment for isolation"
-            ]
-        },
-        
-        "motor_control_center": {
-            "symbols": [
-                "Large rectangle with multiple compartments",
-                "Sections labeled with motor numbers"
-            ],
-            "labels": ["MCC", "MOTOR CONTROL CENTER"],
-            "characteristics": [
-                "Multiple motor starters shown",
-                "Individual compartments numbered",
-                "Large feeder in, multiple motor circuits out"
-            ]
-        },
-        
-        "automatic_transfer_switch": {
-            "symbols": [
-                "Two switches with logic symbol",
-                "Box with 'ATS' label",
-                "Transfer switch schematic"
-            ],
-            "labels": ["ATS", "AUTOMATIC TRANSFER SWITCH", "TRANSFER SWITCH"],
-            "characteristics": [
-                "Two sources (normal and emergency)",
-                "Amperage rating",
-                "Switching logic shown"
-            ]
-        },
-        
-        "generator": {
-            "symbols": [
-                "Circle with 'G' inside",
-                "Generator symbol (rotating machine)"
-            ],
-            "labels": ["GEN", "GENERATOR", "EMERGENCY GENERATOR", "STANDBY GENERATOR"],
-            "characteristics": [
-                "kW rating (100kW, 250kW, 500kW, etc.)",
-                "Voltage output (480V, 208V)",
-                "Fuel type (diesel, gas, NG)"
-            ]
-        },
-        
-        "ups": {
-            "symbols": [
-                "Rectangle with 'UPS' label",
-                "Battery symbol with inverter"
-            ],
-            "labels": ["UPS", "UNINTERRUPTIBLE POWER SUPPLY"],
-            "characteristics": [
-                "kVA or kW rating",
-                "Battery backup time",
-                "Input and output voltages"
-            ]
-        }
-    },
-    
-    "conductors": {
-        "feeder": {
-            "visual": "Thick line or double line between equipment",
-            "annotations": [
-                "Wire size on or near line: (3) #1/0, (3) 250 kcmil",
-                "Conduit size: 1-1/2 EMT, 2 RGS",
-                "Ground wire: #6G, #8 GND"
-            ],
-            "recognition": "Connects major equipment (switchboard to panel)"
-        },
-        
-        "branch_circuit": {
-            "visual": "Thin line from panel to load",
-            "annotations": [
-                "Small wire size: #12, #14",
-                "Circuit number: CKT 1, CKT 2",
-                "Small conduit: 1/2, 3/4"
-            ],
-            "recognition": "Connects panel to final loads (lights, receptacles)"
-        },
-        
-        "home_run": {
-            "visual": "Line with arrow pointing to panel",
-            "symbol": "Arrow or slash marks indicating destination",
-            "annotations": [
-                "Panel designation at arrow",
-                "Circuit numbers"
-            ]
-        }
-    },
-    
-    "power_flow_indicators": {
-        "arrows": "Show direction of power flow",
-        "line_thickness": "Thicker = larger capacity",
-        "connections": "Lines ending at equipment boxes = connections"
-    }
-}
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+try:
+    import marisa_trie
+except ImportError:
+    marisa_trie = None
 
-# ═══════════════════════════════════════════════════════════════
-# MECHANICAL/HVAC SYMBOLS
-# ═══════════════════════════════════════════════════════════════
+logger = logging.getLogger(__name__)
 
-MECHANICAL_SYMBOLS = {
-    "equipment": {
-        "air_handler": {
-            "symbols": [
-                "Rectangle with 'AHU' inside",
-                "Box with fan symbol",
-                "Rectangle showing coils and fan"
-            ],
-            "labels": ["AHU", "AIR HANDLER", "AIR HANDLING UNIT"],
-            "characteristics": [
-                "CFM capacity (1000 CFM, 5000 CFM, etc.)",
-                "Supply and return duct connections",
-                "May show heating/cooling coils"
-            ]
-        },
-        
-        "rooftop_unit": {
-            "symbols": [
-                "Rectangle with 'RTU' inside",
-                "Box on roof outline"
-            ],
-            "labels": ["RTU", "ROOFTOP UNIT", "PACKAGE UNIT"],
-            "characteristics": [
-                "Tonnage (5 TON, 10 TON, 15 TON, etc.)",
-                "Supply duct size",
-                "Return duct size",
-                "Located on roof (per name)"
-            ]
-        },
-        
-        "exhaust_fan": {
-            "symbols": [
-                "Circle with fan blades",
-                "Square with 'EF' inside"
-            ],
-            "labels": ["EF", "EXHAUST FAN", "EF-1"],
-            "characteristics": [
-                "CFM rating",
-                "Duct size",
-                "Location (roof, wall, etc.)"
-            ]
-        },
-        
-        "vav_box": {
-            "symbols": [
-                "Small rectangle on duct",
-                "Box with 'VAV' label"
-            ],
-            "labels": ["VAV", "VARIABLE AIR VOLUME"],
-            "characteristics": [
-                "CFM range (min/max)",
-                "Damper type",
-                "Reheat coil if applicable"
-            ]
-        },
-        
-        "diffuser": {
-            "symbols": [
-                "Square with X inside (supply)",
-                "Square with circle (return)",
-                "Triangle (exhaust)"
-            ],
-            "labels": ["SD (supply)", "RD (return)", "EG (exhaust grille)"],
-            "annotations": [
-                "Size: 24x24, 12x12, etc.",
-                "CFM: 100, 200, etc."
-            ]
-        },
-        
-        "chiller": {
-            "symbols": [
-                "Large rectangle with 'CH' or 'CHILLER'",
-                "Shows refrigerant cycle schematically"
-            ],
-            "labels": ["CH", "CHILLER", "CHILLED WATER PLANT"],
-            "characteristics": [
-                "Tonnage (100 TON, 500 TON, etc.)",
-                "Type (water-cooled, air-cooled)",
-                "Refrigerant type"
-            ]
-        },
-        
-        "boiler": {
-            "symbols": [
-                "Rectangle with 'B' or 'BOILER'",
-                "Shows burner and heat exchanger"
-            ],
-            "labels": ["B", "BOILER", "HW BOILER"],
-            "characteristics": [
-                "BTU output",
-                "Fuel type (gas, oil, electric)",
-                "Pressure rating"
-            ]
-        }
-    },
-    
-    "ductwork": {
-        "supply_duct": {
-            "visual": "Single line or rectangle with 'S' arrow",
-            "annotations": [
-                "Size: 24x12, 20x10, etc. (WxH)",
-                "Round: 12Ø, 16Ø (diameter)",
-                "CFM if shown"
-            ]
-        },
-        
-        "return_duct": {
-            "visual": "Single line or rectangle with 'R' arrow",
-            "annotations": "Same as supply, marked with R"
-        },
-        
-        "exhaust_duct": {
-            "visual": "Line with 'E' or 'EX' arrow",
-            "annotations": "Size and CFM"
-        }
-    },
-    
-    "piping": {
-        "chilled_water": {
-            "visual": "Line with 'CHW' or 'CW' label",
-            "annotations": "Pipe size: 2, 3, 4, 6, etc. (inches)"
-        },
-        
-        "hot_water": {
-            "visual": "Line with 'HW' or 'HHW' label",
-            "annotations": "Pipe size and insulation notes"
-        },
-        
-        "refrigerant": {
-            "visual": "Line with 'REF' or refrigerant type (R-410A)",
-            "annotations": [
-                "Liquid line (LL): smaller diameter",
-                "Suction line (SL): larger diameter"
-            ]
-        },
-        
-        "condensate": {
-            "visual": "Dashed line with 'CD' label",
-            "annotations": "Drain pipe size"
-        }
-    }
+RESOURCE_DIR = pathlib.Path(__file__).parent / "data" / "construction_symbols"
+
+# Discipline -> symbol table name
+TABLE_NAMES = {
+    "electrical": "ELECTRICAL_SYMBOLS",
+    "mechanical": "MECHANICAL_SYMBOLS",
+    "plumbing": "PLUMBING_SYMBOLS",
+    "fire_protection": "FIRE_PROTECTION_SYMBOLS",
+    "structural": "STRUCTURAL_SYMBOLS",
 }
 
+# Prompt prose, kept as data/construction_symbols/<NAME>.txt
+TEXT_NAMES = ("IDENTIFICATION_RULES",)
+
+
+@dataclass(slots=True, frozen=True)
+class EquipmentSpec:
+    """One equipment type's entry in a symbol table (prose may be one string or several)"""
+    symbols: Union[Tuple[str, ...], str] = ()
+    labels: Tuple[str, ...] = ()
+    label_patterns: Tuple[str, ...] = ()
+    characteristics: Union[Tuple[str, ...], str] = ()
+    context_clues: Union[Tuple[str, ...], str] = ()
+    annotations: Union[Tuple[str, ...], str] = ()
+    visual: str = ""
+    symbol: str = ""
+    recognition: str = ""
+
+
+# One str object per distinct string across all tables ("CFM", "gas",
+# "Pipe size..." recur in many entries and disciplines)
+_POOL: dict = {}
+_pool_refs = 0
+
+
+def _share(s: str) -> str:
+    global _pool_refs
+    _pool_refs += 1
+    return _POOL.setdefault(s, sys.intern(s))
+
+
+def _freeze(obj):
+    """
+    Read-only copy of table data: dicts become MappingProxyType, lists
+    become tuples, strings are shared through _POOL
+    """
+    if isinstance(obj, dict):
+        return types.MappingProxyType({_share(k): _freeze(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return tuple(_freeze(v) for v in obj)
+    if isinstance(obj, str):
+        return _share(obj)
+    return obj
+
+
+@functools.lru_cache(maxsize=None)
+def _load(name: str):
+    """Read and freeze one symbol table (cached after first read)"""
+    with open(RESOURCE_DIR / f"{name}.json", encoding="utf-8") as f:
+        raw = json.load(f)
+    # category -> equipment -> EquipmentSpec (or a plain note string)
+    table = types.MappingProxyType({
+        _share(category): types.MappingProxyType({
+            _share(name): (
+                EquipmentSpec(**{_share(k): _freeze(v) for k, v in entry.items()})
+                if isinstance(entry, dict) else _freeze(entry)
+            )
+            for name, entry in entries.items()
+        })
+        for category, entries in raw.items()
+    })
+    logger.debug(
+        "Loaded %s: %d strings so far share %d objects (%.1fx dedup)",
+        name, _pool_refs, len(_POOL), _pool_refs / max(len(_POOL), 1),
+    )
+    return table
+
+
+@functools.lru_cache(maxsize=None)
+def _load_text(name: str) -> str:
+    """Read a prose resource such as IDENTIFICATION_RULES (cached after first read)"""
+    return (RESOURCE_DIR / f"{name}.txt").read_text(encoding="utf-8")
+
+
 # ═══════════════════════════════════════════════════════════════
-# PLUMBING SYMBOLS
+# LABEL LOOKUP (derived from the tables above, built on first use)
 # ═══════════════════════════════════════════════════════════════
 
-PLUMBING_SYMBOLS = {
-    "fixtures": {
-        "water_closet": {
-            "symbols": [
-                "Oval or rectangle (plan view)",
-                "Circle with 'WC' (riser)"
-            ],
-            "labels": ["WC", "WATER CLOSET", "TOILET"],
-            "annotations": ["Flush valve or tank type"]
-        },
-        
-        "lavatory": {
-            "symbols": [
-                "Rectangle or circle (plan view)",
-                "Circle with 'LAV' (riser)"
-            ],
-            "labels": ["LAV", "LAVATORY", "SINK"],
-            "annotations": ["Wall hung or counter mount"]
-        },
-        
-        "urinal": {
-            "symbols": [
-                "Small rectangle or specific urinal shape",
-                "Circle with 'UR' (riser)"
-            ],
-            "labels": ["UR", "URINAL"],
-            "annotations": ["Wall hung or floor mount"]
-        },
-        
-        "shower": {
-            "symbols": [
-                "Square with shower head symbol",
-                "Circle with 'SH' (riser)"
-            ],
-            "labels": ["SH", "SHOWER"],
-            "annotations": ["Dimensions, drain location"]
-        },
-        
-        "floor_drain": {
-            "symbols": [
-                "Square with X",
-                "Circle with 'FD'"
-            ],
-            "labels": ["FD", "FLOOR DRAIN"],
-            "annotations": ["Size: 2, 3, 4, 6 inches"]
-        },
-        
-        "drinking_fountain": {
-            "symbols": [
-                "Specific DF shape",
-                "Circle with 'DF'"
-            ],
-            "labels": ["DF", "DRINKING FOUNTAIN", "WC (water cooler)"]
-        }
-    },
-    
-    "piping": {
-        "cold_water": {
-            "visual": "Solid line",
-            "labels": ["CW", "COLD WATER"],
-            "annotations": "Pipe size: 1/2, 3/4, 1, 1-1/4, 1-1/2, 2, 3, 4, etc."
-        },
-        
-        "hot_water": {
-            "visual": "Line with dashes",
-            "labels": ["HW", "HOT WATER"],
-            "annotations": "Pipe size and insulation"
-        },
-        
-        "sanitary_drain": {
-            "visual": "Heavy line",
-            "labels": ["SAN", "SANITARY", "WASTE"],
-            "annotations": [
-                "Pipe size: 1-1/2, 2, 3, 4, 6, 8, etc.",
-                "Slope: 1/4, 1/8 per foot",
-                "Cleanout locations (CO)"
-            ]
-        },
-        
-        "vent": {
-            "visual": "Thinner line than drain",
-            "labels": ["V", "VENT"],
-            "annotations": "Pipe size: 1-1/4, 1-1/2, 2, 3, 4"
-        },
-        
-        "storm_drain": {
-            "visual": "Line with 'ST' or 'SD' label",
-            "labels": ["ST", "STORM", "SD"],
-            "annotations": "Pipe size and slope"
-        },
-        
-        "gas": {
-            "visual": "Line with 'G' or gas symbol",
-            "labels": ["G", "GAS", "NG (natural gas)"],
-            "annotations": "Pipe size (usually small: 1/2, 3/4, 1)"
-        }
-    },
+DISCIPLINE_NAMES = tuple(TABLE_NAMES)
+
+
+@functools.lru_cache(maxsize=None)
+def _symbol_tables() -> dict:
+    """Discipline -> symbol table"""
+    return {discipline: _load(name) for discipline, name in TABLE_NAMES.items()}
+
+
+# "SD (SUPPLY)" -> "SD": the parenthetical is a description, not drawing text
+_LABEL_NOTE_RE = re.compile(r'\s*\(.*\)$')
+
+
+def _label_key(label: str) -> str:
+    return _LABEL_NOTE_RE.sub('', label).upper()
+
+
+@functools.lru_cache(maxsize=None)
+def _label_paths() -> types.MappingProxyType:
+    """
+    Upper-cased label -> tuple of (discipline, category, equipment) paths,
+    public as LABEL_INDEX. "WC" has two: water_closet and drinking_fountain.
+    """
+    paths = {}
+    for discipline, table in _symbol_tables().items():
+        for category, entries in table.items():
+            for name, entry in entries.items():
+                if not isinstance(entry, EquipmentSpec):
+                    continue
+                for label in entry.labels:
+                    path = (discipline, category, name)
+                    key_paths = paths.setdefault(_label_key(label), [])
+                    if path not in key_paths:
+                        key_paths.append(path)
+    return types.MappingProxyType({key: tuple(key_paths) for key, key_paths in paths.items()})
+
+
+@functools.lru_cache(maxsize=None)
+def _equipment_labels() -> types.MappingProxyType:
+    """
+    (discipline, category, equipment) -> frozenset of its upper-cased labels,
+    for membership tests: token.upper() in EQUIPMENT_LABELS[path]. The tables
+    keep their label tuples, whose order the prompts rely on.
+    """
+    labels = {}
+    for key, paths in _label_paths().items():
+        for path in paths:
+            labels.setdefault(path, set()).add(key)
+    return types.MappingProxyType({path: frozenset(keys) for path, keys in labels.items()})
+
+
+@functools.lru_cache(maxsize=None)
+def _soa():
+    """
+    Flat label table: row i is LABELS[i] -> EQUIP_NAMES[EQUIP_IDX[i]] in
+    DISCIPLINE_NAMES[DISCIPLINE_IDX[i]]. A label with several equipment types
+    has one row per type, first one first. The last item maps a label to its
+    first row.
+    """
+    import numpy as np  # Deferred so importing this module stays cheap
     
-    "equipment": {
-        "water_heater": {
-            "symbols": [
-                "Rectangle or circle with 'WH'",
-                "Tank outline"
-            ],
-            "labels": ["WH", "WATER HEATER", "HWH"],
-            "characteristics": [
-                "Capacity (gallons): 40, 50, 75, 120, etc.",
-                "Input BTU",
-                "Recovery rate",
-                "Gas or electric"
-            ]
-        },
-        
-        "backflow_preventer": {
-            "symbols": [
-                "Specific valve symbol",
-                "Box with 'BFP' or 'RP'"
-            ],
-            "labels": ["BFP", "BACKFLOW PREVENTER", "RP", "RPZ"],
-            "characteristics": "Pipe size, type (RPZ, DC, etc.)"
-        },
-        
-        "water_softener": {
-            "symbols": ["Tank shape with 'WS'"],
-            "labels": ["WS", "WATER SOFTENER"],
-            "characteristics": "Capacity in grains"
-        }
-    }
-}
+    labels, equip_idx, discipline_idx = [], [], []
+    equip_names = {}
+    label_to_row = {}
+    for key, paths in _label_paths().items():
+        key = sys.intern(key)
+        label_to_row[key] = len(labels)
+        for discipline, _, name in paths:
+            labels.append(key)
+            equip_idx.append(equip_names.setdefault(name, len(equip_names)))
+            discipline_idx.append(DISCIPLINE_NAMES.index(discipline))
+    return (
+        np.array(labels),
+        np.array(equip_idx, dtype=np.int32),
+        np.array(discipline_idx, dtype=np.int8),
+        tuple(equip_names),
+        label_to_row,
+    )
 
-# ═══════════════════════════════════════════════════════════════
-# FIRE PROTECTION SYMBOLS
-# ═══════════════════════════════════════════════════════════════
 
-FIRE_PROTECTION_SYMBOLS = {
-    "sprinkler_heads": {
-        "pendent": {
-            "symbol": "Circle with downward stem",
-            "labels": ["P", "PEND", "PENDENT"]
-        },
-        
-        "upright": {
-            "symbol": "Circle with upward stem",
-            "labels": ["U", "UP", "UPRIGHT"]
-        },
-        
-        "sidewall": {
-            "symbol": "Half circle",
-            "labels": ["SW", "SIDEWALL"]
-        },
-        
-        "concealed": {
-            "symbol": "Circle with C",
-            "labels": ["C", "CONC", "CONCEALED"]
-        }
-    },
+@functools.lru_cache(maxsize=None)
+def _label_blob():
+    """
+    The LABELS column packed into one UTF-8 buffer: label i is
+    blob[offsets[i]:offsets[i + 1] - 1], each label followed by a NUL.
+    About a twentieth of the fixed-width LABELS array.
+    """
+    import numpy as np
     
-    "piping": {
-        "sprinkler_main": {
-            "visual": "Heavy line",
-            "annotations": [
-                "Pipe size: 1, 1-1/4, 1-1/2, 2, 2-1/2, 3, 4, 6, 8",
-                "Number of heads served",
-                "Flow direction arrows"
-            ]
-        },
-        
-        "branch_line": {
-            "visual": "Line connecting heads to main",
-            "annotations": "Pipe size and head count"
-        }
-    },
+    encoded = [str(label).encode("utf-8") for label in _soa()[0]]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int32)
+    np.cumsum([len(label) + 1 for label in encoded], out=offsets[1:])
+    return b"\x00".join(encoded) + b"\x00", offsets
+
+
+def get_label(i: int) -> memoryview:
+    """Row i's label as a view into LABEL_BLOB (no copy)"""
+    blob, offsets = _label_blob()
+    return memoryview(blob)[offsets[i]:offsets[i + 1] - 1]
+
+
+def lookup(label: str):
+    """(discipline, equipment) for an exact label, or None"""
+    _, equip_idx, discipline_idx, equip_names, label_to_row = _soa()
+    row = label_to_row.get(_label_key(label))
+    if row is None:
+        return None
+    return DISCIPLINE_NAMES[discipline_idx[row]], equip_names[equip_idx[row]]
+
+
+@functools.lru_cache(maxsize=None)
+def _equip_id() -> type:
+    """IntEnum over EQUIP_NAMES: EquipID.SWITCHBOARD == the switchboard's EQUIP_IDX value"""
+    return enum.IntEnum(
+        "EquipID",
+        [(name.upper(), i) for i, name in enumerate(_soa()[3])],
+        module=__name__,
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _equip_meta() -> tuple:
+    """Table entry for each EquipID, indexed by id: EQUIP_META[EquipID.SWITCHBOARD].labels"""
+    entries = {}
+    for paths in _label_paths().values():
+        for discipline, category, name in paths:
+            if name not in entries:
+                entries[name] = _load(TABLE_NAMES[discipline])[category][name]
+    return tuple(entries[name] for name in _soa()[3])
+
+
+def lookup_id(label: str):
+    """EquipID for an exact label, or None"""
+    _, equip_idx, _, _, label_to_row = _soa()
+    row = label_to_row.get(_label_key(label))
+    if row is None:
+        return None
+    return _equip_id()(int(equip_idx[row]))
+
+
+def resolve(label: str) -> tuple:
+    """Every (discipline, category, equipment) an exact label refers to, or ()"""
+    return _label_paths().get(_label_key(label), ())
+
+
+# Numbered designations: "PP-1" in labels or "PP-# (Power Panel)" in
+# label_patterns make "PP-" a prefix for PP-2, PP-27, PP-3A, ...; so does a
+# bare label ("AHU" -> AHU-1, AHU-12) unless a pattern already claims the prefix
+_DESIGNATION_RE = re.compile(r'^([A-Z]+-)\d+$')
+_BARE_LABEL_RE = re.compile(r'^[A-Z]+$')
+
+
+@functools.lru_cache(maxsize=None)
+def _label_prefixes() -> dict:
+    """Designation prefix -> (discipline, equipment)"""
+    prefixes = {}
+    for discipline, table in _symbol_tables().items():
+        for entries in table.values():
+            for name, entry in entries.items():
+                if not isinstance(entry, EquipmentSpec):
+                    continue
+                for pattern in entry.label_patterns:
+                    spec = pattern.split("(", 1)[0].strip().upper()
+                    if spec.endswith("#"):
+                        prefixes.setdefault(spec[:-1], (discipline, name))
+                for label in entry.labels:
+                    match = _DESIGNATION_RE.match(_label_key(label))
+                    if match:
+                        prefixes.setdefault(match.group(1), (discipline, name))
+    for key in _label_paths():
+        if _BARE_LABEL_RE.match(key):
+            prefixes.setdefault(key + "-", lookup(key))
+    return prefixes
+
+
+def _compile_pattern(spec: str) -> str:
+    """'PP-# (Power Panel)' -> r'PP\-\d+': the note is dropped, '#' is a number"""
+    spec = spec.split("(", 1)[0].strip()
+    return r'\d+'.join(map(re.escape, spec.split("#")))
+
+
+@functools.lru_cache(maxsize=None)
+def _label_pattern_regex() -> re.Pattern:
+    """Anchored regex over every label_patterns spec, one named group per equipment type"""
+    patterns_by_name = {}
+    for table in _symbol_tables().values():
+        for entries in table.values():
+            for name, entry in entries.items():
+                if isinstance(entry, EquipmentSpec):
+                    for spec in entry.label_patterns:
+                        patterns_by_name.setdefault(name, []).append(_compile_pattern(spec))
+    groups = [f"(?P<{name}>" + "|".join(patterns) + ")" for name, patterns in patterns_by_name.items()]
+    return re.compile("^(?:" + "|".join(groups) + ")$", re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=None)
+def _prefix_trie():
+    """Trie over the prefixes for longest-prefix matching (None without marisa-trie)"""
+    if marisa_trie is None:
+        return None
+    return marisa_trie.Trie(_label_prefixes())
+
+
+def classify_token(token: str):
+    """
+    (discipline, equipment) for a single drawing token, or None.
+    Exact labels first, then the longest designation prefix followed by a
+    number ("PP-27" -> panelboard, "AHU-1" -> air_handler via the bare AHU label).
+    """
+    key = token.upper()
+    hit = lookup(key)
+    if hit is not None:
+        return hit
+
+    label_prefixes = _label_prefixes()
+    trie = _prefix_trie()
+    if trie is not None:
+        prefixes = trie.prefixes(key)
+    else:
+        prefixes = [key[:i] for i in range(1, len(key)) if key[:i] in label_prefixes]
+    if prefixes:
+        prefix = max(prefixes, key=len)
+        if key[len(prefix):len(prefix) + 1].isdigit():
+            return label_prefixes[prefix]
+    return None
+
+
+@functools.lru_cache(maxsize=4096)
+def identify_equipment(token: str):
+    """
+    Cached classify_token: (discipline, equipment) or None. Drawings repeat
+    the same tokens (MSB, PP-1, AHU-1) many times, so most calls are a cache
+    hit; pass upper-cased, stripped tokens to share cache entries.
+    """
+    return classify_token(token.strip())
+
+
+@functools.lru_cache(maxsize=None)
+def _automaton():
+    """One automaton over every label in every discipline (None without pyahocorasick)"""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for key in _label_paths():
+        automaton.add_word(key, key)
+    automaton.make_automaton()
+    return automaton
+
+
+@functools.lru_cache(maxsize=None)
+def _all_labels_regex() -> re.Pattern:
+    """Fallback scanner: one alternation, longest labels first so MSB wins over SB"""
+    return re.compile(
+        r'(?<![^\W_])(?:'
+        + '|'.join(map(re.escape, sorted(_label_paths(), key=len, reverse=True)))
+        + r')(?![^\W_])'
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _label_regex(discipline: str) -> re.Pattern:
+    """
+    One case-insensitive regex for a discipline, with a named group per
+    equipment type: m.lastgroup is the equipment key. Labels are tried longest
+    first within a group; a label listed under two types reports the first.
+    """
+    labels_by_name = {}
+    for entries in _load(TABLE_NAMES[discipline]).values():
+        for name, entry in entries.items():
+            if isinstance(entry, EquipmentSpec) and entry.labels:
+                names_labels = labels_by_name.setdefault(name, [])
+                for label in entry.labels:
+                    key = _label_key(label)
+                    if key not in names_labels:
+                        names_labels.append(key)
+
+    groups = [
+        f"(?P<{name}>" + "|".join(map(re.escape, sorted(labels, key=len, reverse=True))) + ")"
+        for name, labels in labels_by_name.items()
+    ]
+    return re.compile(r'(?<![^\W_])(?:' + '|'.join(groups) + r')(?![^\W_])', re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=None)
+def label_regex(equipment_key: str) -> re.Pattern:
+    """
+    Case-insensitive regex matching any label of one equipment type, e.g.
+    label_regex("switchboard"). Compiled once per key; KeyError for an
+    equipment type with no labels.
+    """
+    labels = [
+        key
+        for path, keys in _equipment_labels().items() if path[2] == equipment_key
+        for key in keys
+    ]
+    if not labels:
+        raise KeyError(equipment_key)
+    return re.compile(
+        r'(?<![^\W_])(?:'
+        + '|'.join(map(re.escape, sorted(labels, key=lambda label: (-len(label), label))))
+        + r')(?![^\W_])',
+        re.IGNORECASE,
+    )
+
+
+def _automaton_hits(automaton, upper: str) -> list:
+    """Leftmost-longest, non-overlapping label hits as (start, end, key)"""
+    hits = []
+    n = len(upper)
+    for end, key in automaton.iter(upper):
+        start = end - len(key) + 1
+        if start > 0 and upper[start - 1].isalnum():
+            continue
+        if end + 1 < n and upper[end + 1].isalnum():
+            continue
+        hits.append((start, end, key))
+    hits.sort(key=lambda hit: (hit[0], -hit[1]))
+
+    selected = []
+    last_end = -1
+    for start, end, key in hits:
+        if start > last_end:
+            selected.append((start, end, key))
+            last_end = end
+    return selected
+
+
+def identify(text: str) -> list:
+    """
+    Find every symbol label in text in one pass.
+    Returns [(end, (discipline, category, equipment))], end being the index of
+    the label's last character; a label shared by several equipment types
+    yields one entry per type.
+    """
+    upper = text.upper()
+    automaton = _automaton()
+    if automaton is not None:
+        hits = [(end, key) for _, end, key in _automaton_hits(automaton, upper)]
+    else:
+        hits = [(m.end() - 1, m.group()) for m in _all_labels_regex().finditer(upper)]
+    label_paths = _label_paths()
+    return [(end, path) for end, key in hits for path in label_paths[key]]
+
+
+# Ratings quoted in characteristics: "Rating 400A-4000A typical",
+# "kVA rating (45kVA, 75kVA, 112.5kVA, etc.)", "Tonnage (5 TON, 10 TON, ...)"
+_RATING_RE = re.compile(r'(\d+(?:\.\d+)?)\s*(kVA|kW|CFM|TON|A)\b')
+
+
+@functools.lru_cache(maxsize=None)
+def _rating_ranges() -> dict:
+    """
+    Unit -> (paths, lows, highs): the typical rating range of each equipment
+    type that quotes one, parsed once from its characteristics. Units are
+    upper-cased ("A", "KVA", "KW", "CFM", "TON").
+    """
+    import numpy as np  # Deferred so importing this module stays cheap
     
-    "equipment": {
-        "fire_pump": {
-            "symbols": ["Pump symbol with 'FP'"],
-            "labels": ["FP", "FIRE PUMP"],
-            "characteristics": [
-                "GPM capacity",
-                "Pressure (psi)",
-                "Driver type (electric, diesel)"
-            ]
-        },
-        
-        "fire_department_connection": {
-            "symbols": ["FDC symbol - specific fire department connection"],
-            "labels": ["FDC", "FIRE DEPARTMENT CONNECTION"],
-            "characteristics": "Location and pipe size"
-        },
-        
-        "post_indicator_valve": {
-            "symbols": ["PIV symbol"],
-            "labels": ["PIV", "POST INDICATOR VALVE"],
-            "characteristics": "Size and location"
-        }
+    ranges = {}
+    for discipline, table in _symbol_tables().items():
+        for category, entries in table.items():
+            for name, entry in entries.items():
+                if not isinstance(entry, EquipmentSpec):
+                    continue
+                characteristics = entry.characteristics
+                if isinstance(characteristics, str):
+                    characteristics = (characteristics,)
+                values = {}
+                for text in characteristics:
+                    for number, unit in _RATING_RE.findall(text):
+                        values.setdefault(unit.upper(), []).append(float(number))
+                for unit, numbers in values.items():
+                    ranges.setdefault(unit, []).append(
+                        ((discipline, category, name), min(numbers), max(numbers))
+                    )
+    return {
+        unit: (
+            tuple(path for path, _, _ in rows),
+            np.array([low for _, low, _ in rows], dtype=np.float32),
+            np.array([high for _, _, high in rows], dtype=np.float32),
+        )
+        for unit, rows in ranges.items()
     }
-}
 
-# ═══════════════════════════════════════════════════════════════
-# STRUCTURAL SYMBOLS
-# ═══════════════════════════════════════════════════════════════
 
-STRUCTURAL_SYMBOLS = {
-    "members": {
-        "steel_beam": {
-            "symbols": ["I-shape in section, labeled on plans"],
-            "labels": [
-                "W-shapes: W12x53, W18x86, W24x104",
-                "Wide flange beam designations"
-            ],
-            "annotations": "Beam mark numbers (B1, B2, etc.)"
-        },
-        
-        "steel_column": {
-            "symbols": ["Square or circular column symbol"],
-            "labels": [
-                "W-shapes for heavy: W14x90",
-                "HSS (hollow structural section): HSS8x8x1/2"
-            ],
-            "annotations": "Column mark numbers (C1, C2, etc.)"
-        },
-        
-        "concrete_beam": {
-            "symbols": ["Rectangular section"],
-            "labels": ["B1, B2 (with dimensions like 12x24)"],
-            "annotations": [
-                "Width x Depth",
-                "Reinforcement (#4@12, etc.)"
-            ]
-        },
-        
-        "concrete_column": {
-            "symbols": ["Square or round column"],
-            "labels": ["C1, C2 (with dimensions)"],
-            "annotations": [
-                "Column size: 12x12, 18x18, 24Ø",
-                "Reinforcement pattern"
-            ]
-        },
-        
-        "joist": {
-            "symbols": ["Parallel lines showing joist layout"],
-            "labels": [
-                "Open web joists: 16K4, 22K9",
-                "Wood joists: 2x10@16 O.C."
-            ]
-        },
-        
-        "slab": {
-            "symbols": ["Hatching or solid fill"],
-            "labels": ["SOG (slab on grade)", "Floor slab"],
-            "annotations": [
-                "Thickness: 4, 6, 8 inches",
-                "Reinforcement mesh or bars"
-            ]
-        }
-    },
+def equipment_for_rating(value: float, unit: str) -> list:
+    """
+    (discipline, category, equipment) paths whose typical range covers a
+    rating, e.g. equipment_for_rating(800, "A") -> switchboard
+    """
+    ranges = _rating_ranges().get(unit.upper())
+    if ranges is None:
+        return []
+    paths, lows, highs = ranges
+    import numpy as np
     
-    "foundations": {
-        "footing": {
-            "symbols": ["Rectangle in section, square in plan"],
-            "labels": ["F1, F2 (with dimensions)"],
-            "annotations": "Size and reinforcement"
-        },
-        
-        "pile": {
-            "symbols": ["Circle with cross or pile symbol"],
-            "labels": ["P (with pile designation)"],
-            "annotations": "Pile type and capacity"
-        }
-    }
+    return [paths[i] for i in np.flatnonzero((lows <= value) & (value <= highs))]
+
+
+# Size and rating annotations written next to symbols, one named group per
+# kind; m.lastgroup is the kind. More specific forms come first: "HSS8x8x1/2"
+# before "8x8", "#4@12" (rebar) before "#4" (wire).
+ANNOTATION_RE = re.compile(
+    r'(?<![^\W_])(?:'
+    r'(?P<hss>HSS\d+(?:\.\d+)?X\d+(?:\.\d+)?X\d+(?:/\d+)?)'
+    r'|(?P<wide_flange>W\d+X\d+)'
+    r'|(?P<joist>\d+K\d+)'
+    r'|(?P<rebar>#\d+@\d+)'
+    r'|(?P<wire>(?:\(\d+\)\s*)?#\d+(?:/0)?(?:\s*(?:GND|G))?)'
+    r'|(?P<kcmil>(?:\(\d+\)\s*)?\d+\s*KCMIL)'
+    r'|(?P<conduit>\d+(?:-\d+/\d+|/\d+)?\s*(?:EMT|RGS|IMC|PVC))'
+    r'|(?P<rating>\d+(?:\.\d+)?\s*(?:KVA|KW|CFM|TON))'
+    r'|(?P<round>\d+\s*Ø)'
+    r'|(?P<size>\d+X\d+)'
+    r')(?![^\W_])',
+    re.IGNORECASE,
+)
+
+
+def scan_annotations(text: str) -> list:
+    """
+    Find every size/rating annotation in text in one pass.
+    Returns [(start, kind, annotation)], e.g. (0, "wire", "(3) #1/0").
+    """
+    return [(m.start(), m.lastgroup, m.group()) for m in ANNOTATION_RE.finditer(text)]
+
+
+# Public names for the lazily built tables and indexes
+_LAZY = {
+    "SYMBOL_TABLES": _symbol_tables,
+    "EQUIPMENT_LABELS": _equipment_labels,
+    "LABEL_INDEX": _label_paths,
+    "LABELS": lambda: _soa()[0],
+    "EQUIP_IDX": lambda: _soa()[1],
+    "DISCIPLINE_IDX": lambda: _soa()[2],
+    "EQUIP_NAMES": lambda: _soa()[3],
+    "LABEL_BLOB": lambda: _label_blob()[0],
+    "LABEL_OFFSETS": lambda: _label_blob()[1],
+    "EquipID": _equip_id,
+    "EQUIP_META": _equip_meta,
+    "LABEL_PREFIXES": _label_prefixes,
+    "LABEL_PATTERN_RE": _label_pattern_regex,
+    "PREFIX_TRIE": _prefix_trie,
+    "ALL_SYMBOL_AUTOMATON": _automaton,
+    "RATING_RANGES": _rating_ranges,
+    **{f"{name[:-len('_SYMBOLS')]}_LABEL_RE": functools.partial(_label_regex, discipline)
+       for discipline, name in TABLE_NAMES.items()},
 }
 
-# ═══════════════════════════════════════════════════════════════
-# EQUIPMENT IDENTIFICATION LOGIC
-# ═══════════════════════════════════════════════════════════════
 
-IDENTIFICATION_RULES = """
-HOW TO IDENTIFY EQUIPMENT (NOT BY POSITION):
-
-1. READ LABELS FIRST
-   - Look for text inside or near symbols
-   - Labels are most reliable: "SWITCHBOARD", "PP-1", "AHU-1"
-   
-2. RECOGNIZE SYMBOLS
-   - Match visual symbol to library (rectangle with bars = switchboard)
-   - Symbols are standardized but can vary by engineer
-   
-3. CHECK WIRE/PIPE SIZES
-   - Large wires (500+ kcmil) = main equipment (switchboard, service)
-   - Medium wires (#1/0 to 4/0) = feeders to panels
-   - Small wires (#12, #14) = branch circuits
-   - Ground wire size reveals equipment rating
-   
-4. ANALYZE CONNECTIONS
-   - Equipment with ONE incoming feeder, MANY outgoing = distribution (panel/switchboard)
-   - Equipment with MANY incoming lines, ONE outgoing = combining (paralleled equipment)
-   - Equipment between two sources = transfer switch
-   
-5. USE CONTEXT CLUES
-   - Voltage transformation shown = transformer
-   - Two power sources shown = ATS or paralleling
-   - Rotating equipment symbol = motor or generator
-   
-6. VERIFY WITH MULTIPLE SIGNALS
-   - Don't rely on ONE indicator
-   - Combine: label + symbol + wire size + connections = confident ID
-
-DO NOT ASSUME BY POSITION:
-- Top ≠ necessarily main equipment
-- Left ≠ necessarily source
-- Large box ≠ necessarily most important
-
-EXAMPLE:
-"I see a rectangle labeled 'MSB' with diagonal lines inside, fed by 600 kcmil 
-with #1/0 ground, distributing to 4 smaller panels via #1/0 feeders.
-
-Label: MSB = Main Switchboard ✓
-Symbol: Rectangle with diagonal lines = Switchboard ✓  
-Wire: 600 kcmil incoming = Main equipment ✓
-Ground: #1/0 = 800A rating ✓
-Connections: One in, multiple out = Distribution ✓
-
-CONCLUSION: This is the 800A main switchboard."
-"""
+def __getattr__(name: str):
+    if name in TABLE_NAMES.values():
+        return _load(name)
+    if name in TEXT_NAMES:
+        return _load_text(name)
+    if name in _LAZY:
+        return _LAZY[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(TABLE_NAMES.values()) + list(TEXT_NAMES) + list(_LAZY))
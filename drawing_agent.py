@@ -660,9 +660,9 @@ THIS IS A SINGLE LINE DIAGRAM. It shows ELECTRICAL CONNECTIONS.
 KEY COMPONENTS TO IDENTIFY:
 
 1. EQUIPMENT (Boxes/rectangles/symbols):
-   Switchboards: {ELECTRICAL_SYMBOLS['equipment']['switchboard']['labels']}
-   Panels: {ELECTRICAL_SYMBOLS['equipment']['panelboard']['label_patterns']}
-   Transformers: {ELECTRICAL_SYMBOLS['equipment']['transformer']['labels']}
+   Switchboards: {ELECTRICAL_SYMBOLS['equipment']['switchboard'].labels}
+   Panels: {ELECTRICAL_SYMBOLS['equipment']['panelboard'].label_patterns}
+   Transformers: {ELECTRICAL_SYMBOLS['equipment']['transformer'].labels}
 
 2. CONNECTIONS (Lines between equipment):
    Lines = Feeders/conductors
@@ -4,12 +4,30 @@ Detects equipment boxes, connection lines, and text regions BEFORE AI analysis
 This is what makes autonomous SLD reading possible
 """
 
+import functools
+import hashlib
+import itertools
+import math
+import os
+import pathlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
 import cv2
 import numpy as np
 from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
-@dataclass
+@dataclass(slots=True)
 class EquipmentBox:
     """Detected equipment box on drawing"""
     x: int
@@ -21,7 +39,7 @@ class EquipmentBox:
     area: int
     has_text: bool = False
     
-@dataclass  
+@dataclass(slots=True)
 class ConnectionLine:
     """Detected line connecting equipment"""
     x1: int
@@ -34,7 +52,7 @@ class ConnectionLine:
     dest_box: Optional[int] = None
     text_region: Optional[Tuple[int, int, int, int]] = None
 
-@dataclass
+@dataclass(slots=True)
 class TextRegion:
     """Detected text region (potential labels/specs)"""
     x: int
@@ -45,43 +63,259 @@ class TextRegion:
     near_box: Optional[int] = None
 
 
+def _p2l(px: float, py: float, x1: float, y1: float, x2: float, y2: float) -> float:
+    """Distance from point to line segment on plain floats (Numba-compiled when available)"""
+    dx = x2 - x1
+    dy = y2 - y1
+    length_squared = dx * dx + dy * dy
+    if length_squared == 0:
+        return math.hypot(px - x1, py - y1)
+    t = max(0.0, min(1.0, ((px - x1) * dx + (py - y1) * dy) / length_squared))
+    return math.hypot(px - x1 - t * dx, py - y1 - t * dy)
+
+
+def _p2l_batch(pts: np.ndarray, segs: np.ndarray) -> np.ndarray:
+    """(T, L) distances from pts (T, 2) to segs (L, 4) without (T, L, 2) temporaries"""
+    out = np.empty((pts.shape[0], segs.shape[0]), dtype=np.float64)
+    for i in range(pts.shape[0]):
+        for j in range(segs.shape[0]):
+            out[i, j] = _p2l(pts[i, 0], pts[i, 1], segs[j, 0], segs[j, 1], segs[j, 2], segs[j, 3])
+    return out
+
+
+if njit is not None:
+    _p2l = njit(fastmath=True, cache=True)(_p2l)
+    _p2l_batch = njit(cache=True)(_p2l_batch)
+
+
+# Opt-in (use_cache=True) on-disk memo of analyze_drawing_structure results, keyed by
+# SHA-1 of the file bytes. Entries are plain .npz arrays (never unpickled) in a
+# private per-user directory.
+# Bump the version whenever detection parameters or the stored layout change.
+_TOPOLOGY_CACHE = (pathlib.Path(os.environ.get("XDG_CACHE_HOME") or pathlib.Path.home() / ".cache")
+                   / "construction_ai" / "drawing_topo")
+_TOPOLOGY_CACHE_VERSION = 7
+_TOPOLOGY_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Process-wide hash-consed binarized tiles (see DrawingPreprocessor._binarize_tiled):
+# (kind, binarization params, padded shape, core offset, content hash) -> binarized core tile
+_TILE_CACHE: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+_TILE_CACHE_LOCK = threading.Lock()
+_TILE_CACHE_MAX_TILES = 256  # 512x512 uint8 tiles, ~64 MB
+
+
+@functools.lru_cache(maxsize=1)
+def _load_image(image_path: str, mtime: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Decode an image and its grayscale conversion, cached by (path, mtime)
+    
+    Only the latest drawing is kept, so a long-running server doesn't hold on to
+    decoded uploads. The returned arrays are shared between callers and read-only.
+    """
+    image = cv2.imread(image_path)
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    image.flags.writeable = False
+    gray.flags.writeable = False
+    return image, gray
+
+
+def _load_cached(image_path: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Load (image, gray) for a path, reusing the decode if the file is unchanged"""
+    return _load_image(image_path, os.path.getmtime(image_path))
+
+
 class DrawingPreprocessor:
     """
     Preprocesses electrical drawings to detect structure before AI analysis
     Uses OpenCV to find equipment boxes, connection lines, and text regions
     """
     
-    def __init__(self, image_path: str):
-        """Load and prepare image for analysis"""
+    # Line detection runs on a copy downsampled to about this many pixels
+    MAX_LINE_DETECT_PIXELS = 2_000_000
+    
+    # Global threshold for text detection. None = Otsu per image (the default: a
+    # fixed cut loses faint text on real sheets); an int skips Otsu's histogram pass
+    # and lets tile_cache share global tiles, for scans known to be clean line-art.
+    GLOBAL_BINARY_THRESHOLD: Optional[int] = None
+    
+    # Local thresholding for box detection: 'gaussian' (cv2.adaptiveThreshold) or
+    # 'sauvola' (mean/std from integral images, k and R below)
+    ADAPTIVE_METHOD = 'gaussian'
+    SAUVOLA_K = 0.2
+    SAUVOLA_R = 128
+    
+    # Text candidates whose mean gray level is above this are nearly blank
+    # (line fragments, specks) and are dropped
+    TEXT_MAX_MEAN_BRIGHTNESS = 250
+    
+    # Tile size for tile_cache binarization, plus the context margin each tile is
+    # thresholded with (>= half the 11x11 adaptive window, so tiles match exactly)
+    TILE_SIZE = 512
+    TILE_MARGIN = 8
+    
+    # Prefer the ximgproc Fast Line Detector over Canny + HoughLinesP when
+    # opencv-contrib is installed; plain OpenCV builds always use Hough
+    USE_FAST_LINE_DETECTOR = True
+    
+    # Association switches from dense broadcasting to a KD-tree candidate search
+    # (when scipy is installed) once the pair count reaches this size
+    SPATIAL_INDEX_MIN_PAIRS = 250_000
+    # Segments / boxes larger than this multiple of the median (border and title-block
+    # lines) are checked densely, so they don't widen the KD-tree search radius
+    SPATIAL_INDEX_OUTLIER_FACTOR = 4
+    
+    def __init__(self, image_path: str, fast_mode: bool = False, tile_cache: bool = False,
+                 use_cache: bool = False):
+        """
+        Load and prepare image for analysis
+        
+        fast_mode: box and text detection share one global binarization instead of
+        also running adaptive thresholding (fine for clean line-art scans)
+        tile_cache: binarize tile by tile, reusing tiles already seen in this process
+        (title blocks and legends repeated across a sheet set); results are identical
+        use_cache: reuse detection results stored on disk for identical drawing files
+        (opt-in, for development and repeated batch runs)
+        """
         self.image_path = image_path
-        self.image = cv2.imread(image_path)
-        self.gray = cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY)
+        self.fast_mode = fast_mode
+        self.tile_cache = tile_cache
+        self.use_cache = use_cache
+        self.image, self.gray = _load_cached(image_path)
         self.height, self.width = self.gray.shape
         
-        # Detection results
-        self.equipment_boxes: List[EquipmentBox] = []
-        self.connection_lines: List[ConnectionLine] = []
-        self.text_regions: List[TextRegion] = []
+        # Detection results as Structure-of-Arrays, one row per element
+        self.boxes_arr = np.empty((0, 4), dtype=np.int32)   # x, y, w, h (largest area first)
+        self.lines_arr = np.empty((0, 4), dtype=np.int32)   # x1, y1, x2, y2
+        self.line_len = np.empty(0, dtype=np.float64)
+        self.line_angle = np.empty(0, dtype=np.float64)
+        self.texts_arr = np.empty((0, 4), dtype=np.int32)   # x, y, w, h
         
+        # Association results, -1 = none
+        self.line_source = np.empty(0, dtype=np.int32)      # box index at line start
+        self.line_dest = np.empty(0, dtype=np.int32)        # box index at line end
+        self.line_text = np.empty(0, dtype=np.int32)        # text region labelling the line
+        self.text_near_line = np.empty(0, dtype=np.int32)   # nearest line to each text region
+        
+        # Dataclass views over the arrays, rebuilt lazily after they change
+        self._box_view: Optional[List[EquipmentBox]] = None
+        self._line_view: Optional[List[ConnectionLine]] = None
+        self._text_view: Optional[List[TextRegion]] = None
+        
+        # Topology from analyze_drawing_structure, reused on repeat calls
+        self._topology: Optional[Dict] = None
+        
+        # Downsampled grayscale for line detection, built on first use
+        self._gray_small: Optional[Tuple[np.ndarray, int]] = None
+        
+        # Binarized images by kind, built on first use (see _get_binary)
+        self._binary: Dict[str, np.ndarray] = {}
+        self._binary_locks = {'adaptive': threading.Lock(), 'global': threading.Lock()}
+        
+        # Reusable 8-bit output buffers by purpose (see _buffer)
+        self._buffers: Dict[str, np.ndarray] = {}
+        
+        # Summed-area table of self.gray, built on first use (see _integral_image)
+        self._integral: Optional[np.ndarray] = None
+        self._integral_lock = threading.Lock()
+    
+    @property
+    def equipment_boxes(self) -> List[EquipmentBox]:
+        """Detected boxes as dataclasses (read-time view of boxes_arr)"""
+        if self._box_view is None:
+            self._box_view = [
+                EquipmentBox(
+                    x=x, y=y, width=w, height=h,
+                    center_x=x + w//2,
+                    center_y=y + h//2,
+                    area=w * h
+                )
+                for x, y, w, h in self.boxes_arr.tolist()
+            ]
+        return self._box_view
+    
+    @property
+    def connection_lines(self) -> List[ConnectionLine]:
+        """Detected lines as dataclasses (read-time view of lines_arr and associations)"""
+        if self._line_view is None:
+            texts = self.texts_arr.tolist()
+            self._line_view = [
+                ConnectionLine(
+                    x1=x1, y1=y1, x2=x2, y2=y2,
+                    length=length,
+                    angle=angle,
+                    source_box=src if src >= 0 else None,
+                    dest_box=dst if dst >= 0 else None,
+                    text_region=tuple(texts[txt]) if txt >= 0 else None
+                )
+                for (x1, y1, x2, y2), length, angle, src, dst, txt in zip(
+                    self.lines_arr.tolist(), self.line_len.tolist(), self.line_angle.tolist(),
+                    self.line_source.tolist(), self.line_dest.tolist(), self.line_text.tolist()
+                )
+            ]
+        return self._line_view
+    
+    @property
+    def text_regions(self) -> List[TextRegion]:
+        """Detected text regions as dataclasses (read-time view of texts_arr)"""
+        if self._text_view is None:
+            self._text_view = [
+                TextRegion(x=x, y=y, width=w, height=h,
+                           near_line=line if line >= 0 else None)
+                for (x, y, w, h), line in zip(self.texts_arr.tolist(), self.text_near_line.tolist())
+            ]
+        return self._text_view
+    
+    def _set_boxes(self, boxes_arr: np.ndarray):
+        """Replace detected boxes; line endpoints must be re-associated"""
+        self.boxes_arr = boxes_arr
+        self.line_source = np.full(len(self.lines_arr), -1, dtype=np.int32)
+        self.line_dest = np.full(len(self.lines_arr), -1, dtype=np.int32)
+        self._box_view = self._line_view = None
+    
+    def _set_lines(self, lines_arr: np.ndarray, line_len: np.ndarray, line_angle: np.ndarray):
+        """Replace detected lines and clear every line association"""
+        self.lines_arr = lines_arr
+        self.line_len = line_len
+        self.line_angle = line_angle
+        self.line_source = np.full(len(lines_arr), -1, dtype=np.int32)
+        self.line_dest = np.full(len(lines_arr), -1, dtype=np.int32)
+        self.line_text = np.full(len(lines_arr), -1, dtype=np.int32)
+        self.text_near_line = np.full(len(self.texts_arr), -1, dtype=np.int32)
+        self._line_view = self._text_view = None
+    
+    def _set_texts(self, texts_arr: np.ndarray):
+        """Replace detected text regions; text-line links must be re-associated"""
+        self.texts_arr = texts_arr
+        self.text_near_line = np.full(len(texts_arr), -1, dtype=np.int32)
+        self.line_text = np.full(len(self.lines_arr), -1, dtype=np.int32)
+        self._line_view = self._text_view = None
+    
     def detect_equipment_boxes(self, min_size: int = 1000, max_size: int = 50000) -> List[EquipmentBox]:
         """
         Detect rectangular equipment boxes (switchboards, panels, transformers)
         
         Returns equipment boxes sorted by size (largest first = likely main equipment)
         """
+        self._set_boxes(self._find_equipment_boxes(min_size, max_size))
+        return self.equipment_boxes
+    
+    def _find_equipment_boxes(self, min_size: int, max_size: int) -> np.ndarray:
+        """Box detection without touching instance state; returns (N, 4) x, y, w, h"""
         # Adaptive threshold to handle varying contrast
-        binary = cv2.adaptiveThreshold(
-            self.gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-            cv2.THRESH_BINARY_INV, 11, 2
-        )
+        binary = self._get_binary('adaptive')
         
         # Find contours
         contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
         
+        # Cheap rejects first: too few points to be a box, or enclosed area far below
+        # min_size / at least max_size (bounding-rect area is never smaller)
+        candidates = [
+            c for c in contours
+            if len(c) >= 4 and min_size * 0.5 <= cv2.contourArea(c) < max_size
+        ]
+        
         boxes = []
-        for contour in contours:
-            # Get bounding rectangle
-            x, y, w, h = cv2.boundingRect(contour)
+        for x, y, w, h in map(cv2.boundingRect, candidates):
             area = w * h
             
             # Filter by size and aspect ratio
@@ -90,56 +324,259 @@ class DrawingPreprocessor:
                 
                 # Equipment boxes are roughly rectangular (not extreme aspect ratios)
                 if 0.3 < aspect_ratio < 3.0:
-                    boxes.append(EquipmentBox(
-                        x=x, y=y, width=w, height=h,
-                        center_x=x + w//2,
-                        center_y=y + h//2,
-                        area=area
-                    ))
+                    boxes.append((x, y, w, h))
         
-        # Sort by area (largest first - likely main equipment)
-        boxes.sort(key=lambda b: b.area, reverse=True)
+        boxes_arr = np.array(boxes, dtype=np.int32).reshape(-1, 4)
         
-        self.equipment_boxes = boxes
-        return boxes
+        # Sort by area (largest first - likely main equipment)
+        order = np.argsort(-(boxes_arr[:, 2] * boxes_arr[:, 3]), kind='stable')
+        return boxes_arr[order]
     
     def detect_connection_lines(self, min_length: int = 50) -> List[ConnectionLine]:
         """
         Detect lines connecting equipment (electrical feeders)
         
-        Uses Hough Line Transform to find straight lines
+        Uses the Fast Line Detector when opencv-contrib is available, otherwise
+        the Hough Line Transform. Large scans are downsampled to ~2 MP first;
+        endpoints are scaled back to full resolution.
+        """
+        self._set_lines(*self._find_connection_lines(min_length))
+        return self.connection_lines
+    
+    def _find_connection_lines(self, min_length: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Line detection without touching detection results; returns (coords, lengths, angles)"""
+        small, scale = self._get_gray_small()
+        
+        if self.USE_FAST_LINE_DETECTOR and hasattr(cv2, 'ximgproc'):
+            lines = self._fast_line_segments(small, max(1, min_length // scale))
+        else:
+            lines = self._hough_line_segments(small, max(1, min_length // scale), scale)
+        
+        # All segments at once, scaled back to full resolution
+        coords = lines * scale
+        dx = (coords[:, 2] - coords[:, 0]).astype(np.float64)
+        dy = (coords[:, 3] - coords[:, 1]).astype(np.float64)
+        
+        # Calculate length and angle
+        lengths = np.hypot(dx, dy)
+        angles = np.degrees(np.arctan2(dy, dx))
+        
+        keep = lengths >= min_length
+        return coords[keep], lengths[keep], angles[keep]
+    
+    @staticmethod
+    def _fast_line_segments(gray: np.ndarray, min_length: int) -> np.ndarray:
+        """
+        Segments from the Fast Line Detector (opencv-contrib ximgproc), (N, 4) int32
+        
+        Gradient-orientation segment fitting: no separate Canny pass and no Hough
+        accumulator, typically several times faster than HoughLinesP on large sheets.
+        """
+        fld = cv2.ximgproc.createFastLineDetector(
+            length_threshold=min_length,
+            distance_threshold=1.4,
+            do_merge=True
+        )
+        lines = fld.detect(gray)
+        if lines is None:
+            return np.empty((0, 4), dtype=np.int32)
+        return np.rint(lines.reshape(-1, 4)).astype(np.int32)
+    
+    def _hough_line_segments(self, gray: np.ndarray, min_length: int, scale: int = 1) -> np.ndarray:
+        """
+        Segments from Canny + probabilistic Hough transform, (N, 4) int32
+        
+        scale: downsampling factor of gray; the vote threshold and gap tolerance are
+        full-resolution pixel counts and shrink with it like min_length does
         """
         # Edge detection
-        edges = cv2.Canny(self.gray, 50, 150, apertureSize=3)
+        edges = cv2.Canny(gray, 50, 150, edges=self._buffer('edges', gray), apertureSize=3)
         
         # Detect lines using probabilistic Hough transform
         lines = cv2.HoughLinesP(
             edges, 
             rho=1, 
             theta=np.pi/180, 
-            threshold=50,
+            threshold=max(1, 50 // scale),
             minLineLength=min_length,
-            maxLineGap=10
+            maxLineGap=max(1, 10 // scale)
         )
+        if lines is None:
+            return np.empty((0, 4), dtype=np.int32)
+        return lines.reshape(-1, 4).astype(np.int32)
+    
+    def _get_gray_small(self) -> Tuple[np.ndarray, int]:
+        """
+        Grayscale image downsampled to roughly MAX_LINE_DETECT_PIXELS
+        
+        Returns (image, integer scale factor); scale is 1 when no resize was needed
+        """
+        if self._gray_small is None:
+            scale = max(1, int(math.sqrt(self.gray.size / self.MAX_LINE_DETECT_PIXELS)))
+            if scale == 1:
+                self._gray_small = (self.gray, 1)
+            else:
+                small = cv2.resize(self.gray, (self.width // scale, self.height // scale),
+                                   interpolation=cv2.INTER_AREA)
+                self._gray_small = (small, scale)
+        return self._gray_small
+    
+    def _get_binary(self, kind: str) -> np.ndarray:
+        """
+        Inverted binary image of self.gray, computed once per kind
         
-        connection_lines = []
-        if lines is not None:
-            for line in lines:
-                x1, y1, x2, y2 = line[0]
+        kind: 'adaptive' (Gaussian adaptive threshold) or 'global'
+        (GLOBAL_BINARY_THRESHOLD, or Otsu when that is None).
+        In fast_mode every kind resolves to the global binary.
+        """
+        if self.fast_mode:
+            kind = 'global'
+        
+        if kind not in self._binary_locks:
+            raise ValueError(f"Unknown binarization kind: {kind}")
+        
+        # Concurrent passes asking for the same kind (fast_mode) compute it only once
+        with self._binary_locks[kind]:
+            if kind not in self._binary:
+                dst = self._buffer(kind, self.gray)
+                otsu = kind == 'global' and self.GLOBAL_BINARY_THRESHOLD is None
+                if self.tile_cache and not otsu:
+                    self._binary[kind] = self._binarize_tiled(kind, dst)
+                else:
+                    self._binary[kind] = self._binarize(kind, self.gray, dst)
+        
+        return self._binary[kind]
+    
+    def _integral_image(self) -> np.ndarray:
+        """
+        Summed-area table of self.gray, shape (H+1, W+1), built once per drawing
+        
+        Stored as uint32 and allowed to wrap: window sums are taken with uint32
+        arithmetic too, which is exact as long as a single window sums below 2**32.
+        """
+        with self._integral_lock:
+            if self._integral is None:
+                self._integral = self._summed_area(self.gray)
+        return self._integral
+    
+    @staticmethod
+    def _summed_area(values: np.ndarray) -> np.ndarray:
+        """Zero-padded (H+1, W+1) uint32 summed-area table (wrapping)"""
+        table = np.zeros((values.shape[0] + 1, values.shape[1] + 1), dtype=np.uint32)
+        np.cumsum(values, axis=0, dtype=np.uint32, out=table[1:, 1:])
+        np.cumsum(table[1:, 1:], axis=1, dtype=np.uint32, out=table[1:, 1:])
+        return table
+    
+    def _local_mean(self, x: int, y: int, w: int, h: int) -> float:
+        """Mean gray level of a rectangle in O(1) from the integral image"""
+        I = self._integral_image()
+        total = (int(I[y + h, x + w]) - int(I[y, x + w]) - int(I[y + h, x]) + int(I[y, x])) & 0xFFFFFFFF
+        return total / (w * h)
+    
+    def _local_means(self, rects: np.ndarray) -> np.ndarray:
+        """_local_mean for an (N, 4) x, y, w, h array"""
+        if not len(rects):
+            return np.empty(0, dtype=np.float64)
+        I = self._integral_image()
+        x, y, w, h = rects.T
+        total = I[y + h, x + w] - I[y, x + w] - I[y + h, x] + I[y, x]
+        return total / (w * h)
+    
+    def _sauvola(self, gray: np.ndarray, dst: Optional[np.ndarray] = None, window: int = 11) -> np.ndarray:
+        """
+        Inverted Sauvola binarization from summed-area tables
+        
+        Threshold T = mean * (1 + k * (std / R - 1)) over a window x window
+        neighbourhood (clipped at the borders); pixels <= T become 255.
+        """
+        S = self._integral_image() if gray is self.gray else self._summed_area(gray)
+        SQ = self._summed_area(gray.astype(np.uint32) ** 2)
+        
+        r = window // 2
+        rows, cols = np.arange(gray.shape[0]), np.arange(gray.shape[1])
+        y0, y1 = np.clip(rows - r, 0, None), np.clip(rows + r + 1, None, gray.shape[0])
+        x0, x1 = np.clip(cols - r, 0, None), np.clip(cols + r + 1, None, gray.shape[1])
+        count = ((y1 - y0)[:, None] * (x1 - x0)[None, :]).astype(np.float64)
+        
+        def window_sum(table):
+            return (table[y1][:, x1] - table[y0][:, x1] - table[y1][:, x0] + table[y0][:, x0]).astype(np.float64)
+        
+        mean = window_sum(S) / count
+        std = np.sqrt(np.maximum(window_sum(SQ) / count - mean ** 2, 0))
+        threshold = mean * (1 + self.SAUVOLA_K * (std / self.SAUVOLA_R - 1))
+        
+        if dst is None:
+            dst = np.empty_like(gray)
+        np.multiply(gray <= threshold, 255, out=dst, casting='unsafe')
+        return dst
+    
+    def _binarize(self, kind: str, gray: np.ndarray, dst: Optional[np.ndarray] = None) -> np.ndarray:
+        """Threshold one image (or tile) for the given binarization kind"""
+        if kind == 'adaptive' and self.ADAPTIVE_METHOD == 'sauvola':
+            return self._sauvola(gray, dst)
+        if kind == 'adaptive':
+            return cv2.adaptiveThreshold(
+                gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
+                cv2.THRESH_BINARY_INV, 11, 2, dst=dst
+            )
+        if self.GLOBAL_BINARY_THRESHOLD is None:
+            _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU, dst=dst)
+        else:
+            _, binary = cv2.threshold(gray, self.GLOBAL_BINARY_THRESHOLD, 255, cv2.THRESH_BINARY_INV, dst=dst)
+        return binary
+    
+    def _binarize_tiled(self, kind: str, dst: np.ndarray) -> np.ndarray:
+        """
+        Binarize self.gray tile by tile, hash-consing tiles across drawings
+        
+        Thresholding only looks at a small neighbourhood, so each tile thresholded
+        with TILE_MARGIN pixels of context equals the whole-image result. Contours and
+        lines are not tiled: RETR_EXTERNAL nesting and Hough voting depend on the whole
+        sheet. Otsu picks one global threshold, so it never goes through here.
+        """
+        size, margin = self.TILE_SIZE, self.TILE_MARGIN
+        for y in range(0, self.height, size):
+            for x in range(0, self.width, size):
+                y0, x0 = max(0, y - margin), max(0, x - margin)
+                y1, x1 = min(self.height, y + size + margin), min(self.width, x + size + margin)
+                padded = np.ascontiguousarray(self.gray[y0:y1, x0:x1])
+                key = (kind, self._binarization_params(), padded.shape, (y - y0, x - x0),
+                       hashlib.blake2b(padded.data, digest_size=16).digest())
+                
+                with _TILE_CACHE_LOCK:
+                    core = _TILE_CACHE.get(key)
+                    if core is not None:
+                        _TILE_CACHE.move_to_end(key)
                 
-                # Calculate length and angle
-                length = np.sqrt((x2 - x1)**2 + (y2 - y1)**2)
-                angle = np.arctan2(y2 - y1, x2 - x1) * 180 / np.pi
+                if core is None:
+                    core = self._binarize(kind, padded)[y - y0:y - y0 + size, x - x0:x - x0 + size].copy()
+                    with _TILE_CACHE_LOCK:
+                        _TILE_CACHE[key] = core
+                        if len(_TILE_CACHE) > _TILE_CACHE_MAX_TILES:
+                            _TILE_CACHE.popitem(last=False)
                 
-                if length >= min_length:
-                    connection_lines.append(ConnectionLine(
-                        x1=x1, y1=y1, x2=x2, y2=y2,
-                        length=length,
-                        angle=angle
-                    ))
+                dst[y:y + core.shape[0], x:x + core.shape[1]] = core
+        return dst
+    
+    def _binarization_params(self) -> str:
+        """Short tag for the tunable binarization settings (used in cache keys)"""
+        if self.ADAPTIVE_METHOD == 'sauvola':
+            adaptive = f"sauvola{self.SAUVOLA_K}_{self.SAUVOLA_R}"
+        else:
+            adaptive = self.ADAPTIVE_METHOD
+        return f"t{self.GLOBAL_BINARY_THRESHOLD}-{adaptive}"
+    
+    def _buffer(self, name: str, like: np.ndarray) -> np.ndarray:
+        """
+        Output buffer shaped like `like`, allocated once per name and reused
         
-        self.connection_lines = connection_lines
-        return connection_lines
+        Each concurrent detection pass uses its own names, so buffers are never shared
+        between threads. Contents are overwritten by the next pass with the same name.
+        """
+        buf = self._buffers.get(name)
+        if buf is None or buf.shape != like.shape or buf.dtype != like.dtype:
+            buf = self._buffers[name] = np.empty_like(like)
+        return buf
     
     def detect_text_regions(self) -> List[TextRegion]:
         """
@@ -147,12 +584,17 @@ class DrawingPreprocessor:
         
         Uses morphological operations to find text-like patterns
         """
+        self._set_texts(self._find_text_regions())
+        return self.text_regions
+    
+    def _find_text_regions(self) -> np.ndarray:
+        """Text detection without touching instance state; returns (N, 4) x, y, w, h"""
         # Threshold
-        _, binary = cv2.threshold(self.gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+        binary = self._get_binary('global')
         
         # Morphological operations to connect text
         kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (10, 3))
-        dilated = cv2.dilate(binary, kernel, iterations=1)
+        dilated = cv2.dilate(binary, kernel, dst=self._buffer('text_dilated', binary), iterations=1)
         
         # Find text contours
         contours, _ = cv2.findContours(dilated, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
@@ -166,77 +608,160 @@ class DrawingPreprocessor:
             
             # Filter for text-like regions
             if aspect_ratio > 1.5 and 100 < w * h < 10000:
-                text_regions.append(TextRegion(x=x, y=y, width=w, height=h))
+                text_regions.append((x, y, w, h))
         
-        self.text_regions = text_regions
-        return text_regions
+        texts_arr = np.array(text_regions, dtype=np.int32).reshape(-1, 4)
+        
+        # Drop nearly blank candidates; O(1) per region from the integral image
+        return texts_arr[self._local_means(texts_arr) <= self.TEXT_MAX_MEAN_BRIGHTNESS]
     
     def associate_text_with_lines(self, proximity_threshold: int = 30):
         """
         Associate detected text regions with nearby connection lines
         Text near a line likely describes that feeder's specifications
         """
-        for text_region in self.text_regions:
-            text_center_x = text_region.x + text_region.width // 2
-            text_center_y = text_region.y + text_region.height // 2
-            
-            min_distance = float('inf')
-            nearest_line_idx = None
-            
-            for idx, line in enumerate(self.connection_lines):
-                # Calculate distance from text center to line
-                distance = self._point_to_line_distance(
-                    text_center_x, text_center_y,
-                    line.x1, line.y1, line.x2, line.y2
-                )
-                
-                if distance < min_distance and distance < proximity_threshold:
-                    min_distance = distance
-                    nearest_line_idx = idx
-            
-            if nearest_line_idx is not None:
-                text_region.near_line = nearest_line_idx
-                # Store text region coordinates with the line
-                self.connection_lines[nearest_line_idx].text_region = (
-                    text_region.x, text_region.y, 
-                    text_region.width, text_region.height
-                )
+        if not len(self.texts_arr) or not len(self.lines_arr):
+            return
+        
+        nearest, within = self._associate_text_with_lines_vec(proximity_threshold)
+        self.text_near_line = np.where(within, nearest, -1).astype(np.int32)
+        
+        # Store text region with its line; when several texts share a line the last one wins
+        text_idx = np.flatnonzero(within)[::-1]
+        line_idx, first = np.unique(nearest[text_idx], return_index=True)
+        self.line_text[line_idx] = text_idx[first]
+        
+        self._line_view = self._text_view = None
+    
+    def _associate_text_with_lines_vec(self, proximity_threshold: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Nearest line segment to every text center
+        
+        Dense (T, L) broadcast for small drawings; KD-tree over line midpoints
+        plus exact refinement of candidates for large ones.
+        Returns (nearest line index per text, mask of texts within threshold)
+        """
+        P = (self.texts_arr[:, :2] + self.texts_arr[:, 2:] // 2).astype(np.float32)  # (T, 2)
+        A = self.lines_arr[:, :2].astype(np.float32)                       # (L, 2)
+        B = self.lines_arr[:, 2:].astype(np.float32)                       # (L, 2)
+        
+        if cKDTree is not None and len(P) * len(A) >= self.SPATIAL_INDEX_MIN_PAIRS:
+            return self._nearest_lines_indexed(P, A, B, proximity_threshold)
+        
+        if njit is not None:
+            d = _p2l_batch(P.astype(np.float64), self.lines_arr.astype(np.float64))
+        else:
+            d = self._point_segment_distance(P[:, None, :], A[None, :, :], B[None, :, :])  # (T, L)
+        
+        nearest = d.argmin(axis=1)
+        within = d[np.arange(len(P)), nearest] < proximity_threshold
+        return nearest, within
+    
+    def _nearest_lines_indexed(self, P: np.ndarray, A: np.ndarray, B: np.ndarray,
+                               proximity_threshold: int) -> Tuple[np.ndarray, np.ndarray]:
+        """KD-tree variant of _associate_text_with_lines_vec (same results)"""
+        lengths = np.linalg.norm(B - A, axis=1)
+        outlier = lengths > self.SPATIAL_INDEX_OUTLIER_FACTOR * np.median(lengths)
+        short, long_ = np.flatnonzero(~outlier), np.flatnonzero(outlier)
+        
+        # A segment within threshold of P has its midpoint within threshold + half its length
+        radius = lengths[short].max() / 2 + proximity_threshold + 1
+        tree = cKDTree((A[short] + B[short]) / 2)
+        text_idx, line_idx = self._flatten_candidates(tree.query_ball_point(P, r=radius))
+        line_idx = short[line_idx]
+        
+        # Long segments: the nearest one per text, found densely, joins the candidates
+        if len(long_):
+            d_long = self._point_segment_distance(P[:, None, :], A[long_][None, :, :], B[long_][None, :, :])
+            text_idx = np.concatenate([text_idx, np.arange(len(P))])
+            line_idx = np.concatenate([line_idx, long_[d_long.argmin(axis=1)]])
+        
+        d = self._point_segment_distance(P[text_idx], A[line_idx], B[line_idx])
+        
+        # Per text: smallest distance, ties broken by lowest line index (as argmin does)
+        order = np.lexsort((line_idx, d, text_idx))
+        text_idx, line_idx, d = text_idx[order], line_idx[order], d[order]
+        _, first = np.unique(text_idx, return_index=True)
+        
+        nearest = np.zeros(len(P), dtype=np.intp)
+        within = np.zeros(len(P), dtype=bool)
+        nearest[text_idx[first]] = line_idx[first]
+        within[text_idx[first]] = d[first] < proximity_threshold
+        return nearest, within
+    
+    @staticmethod
+    def _point_segment_distance(P: np.ndarray, A: np.ndarray, B: np.ndarray) -> np.ndarray:
+        """Distance from points P to segments A-B; inputs broadcast like NumPy, last axis is (x, y)"""
+        AB = B - A
+        L2 = (AB ** 2).sum(axis=-1)
+        
+        # Projection parameter of each point onto each segment, clamped to the segment
+        t = np.clip(((P - A) * AB).sum(axis=-1) / np.where(L2 == 0, 1, L2), 0, 1)
+        proj = A + t[..., None] * AB
+        return np.linalg.norm(P - proj, axis=-1)
+    
+    @staticmethod
+    def _flatten_candidates(candidates) -> Tuple[np.ndarray, np.ndarray]:
+        """query_ball_point result (one index list per query) -> parallel (query, match) arrays"""
+        counts = np.fromiter(map(len, candidates), dtype=np.intp, count=len(candidates))
+        query_idx = np.repeat(np.arange(len(candidates)), counts)
+        match_idx = np.fromiter(itertools.chain.from_iterable(candidates), dtype=np.intp, count=counts.sum())
+        return query_idx, match_idx
     
     def associate_lines_with_boxes(self, proximity_threshold: int = 20):
         """
         Determine which equipment boxes each line connects
         This reveals the power distribution topology
         """
-        for line_idx, line in enumerate(self.connection_lines):
-            # Check line endpoints against box locations
-            for box_idx, box in enumerate(self.equipment_boxes):
-                # Check if line start point is near/in box
-                if self._point_near_box(line.x1, line.y1, box, proximity_threshold):
-                    if line.source_box is None:
-                        line.source_box = box_idx
-                
-                # Check if line end point is near/in box  
-                if self._point_near_box(line.x2, line.y2, box, proximity_threshold):
-                    if line.dest_box is None:
-                        line.dest_box = box_idx
+        if not len(self.lines_arr) or not len(self.boxes_arr):
+            return
+        
+        bx = np.hstack([self.boxes_arr[:, :2], self.boxes_arr[:, :2] + self.boxes_arr[:, 2:]])
+        src = self._first_box_near(self.lines_arr[:, :2], bx, proximity_threshold)
+        dst = self._first_box_near(self.lines_arr[:, 2:], bx, proximity_threshold)
+        
+        # Keep any association already made
+        self.line_source = np.where(self.line_source >= 0, self.line_source, src).astype(np.int32)
+        self.line_dest = np.where(self.line_dest >= 0, self.line_dest, dst).astype(np.int32)
+        
+        self._line_view = None
+    
+    def _first_box_near(self, points: np.ndarray, bx: np.ndarray, threshold: int) -> np.ndarray:
+        """First box (in box order) whose padded extent contains each point, -1 if none"""
+        if cKDTree is None or len(points) * len(bx) < self.SPATIAL_INDEX_MIN_PAIRS:
+            hits = self._points_near_boxes(points[:, None, :], bx[None, :, :], threshold)  # (N, B)
+            return np.where(hits.any(axis=1), hits.argmax(axis=1), -1)
+        
+        half_diag = np.hypot(bx[:, 2] - bx[:, 0] + 2 * threshold, bx[:, 3] - bx[:, 1] + 2 * threshold) / 2
+        outlier = half_diag > self.SPATIAL_INDEX_OUTLIER_FACTOR * np.median(half_diag)
+        small, large = np.flatnonzero(~outlier), np.flatnonzero(outlier)
+        
+        # Candidate boxes: center within the largest padded half-diagonal of the point
+        centers = (bx[small, :2] + bx[small, 2:]) / 2
+        radius = half_diag[small].max() + 1
+        point_idx, box_idx = self._flatten_candidates(cKDTree(centers).query_ball_point(points, r=radius))
+        box_idx = small[box_idx]
+        
+        hit = self._points_near_boxes(points[point_idx], bx[box_idx], threshold)
+        first = np.full(len(points), len(bx), dtype=np.intp)
+        np.minimum.at(first, point_idx[hit], box_idx[hit])
+        
+        # Large boxes are checked densely against every point
+        if len(large):
+            hits = self._points_near_boxes(points[:, None, :], bx[large][None, :, :], threshold)  # (N, large)
+            first = np.minimum(first, np.where(hits.any(axis=1), large[hits.argmax(axis=1)], len(bx)))
+        return np.where(first < len(bx), first, -1)
+    
+    @staticmethod
+    def _points_near_boxes(points: np.ndarray, bx: np.ndarray, threshold: int) -> np.ndarray:
+        """Point inside or within threshold of box extent (x1, y1, x2, y2); broadcasts like NumPy"""
+        return ((points[..., 0] >= bx[..., 0] - threshold) & (points[..., 0] <= bx[..., 2] + threshold) &
+                (points[..., 1] >= bx[..., 1] - threshold) & (points[..., 1] <= bx[..., 3] + threshold))
     
     def _point_to_line_distance(self, px: int, py: int, 
                                   x1: int, y1: int, x2: int, y2: int) -> float:
         """Calculate perpendicular distance from point to line segment"""
-        line_length_squared = (x2 - x1)**2 + (y2 - y1)**2
-        
-        if line_length_squared == 0:
-            return np.sqrt((px - x1)**2 + (py - y1)**2)
-        
-        # Calculate projection parameter
-        t = max(0, min(1, ((px - x1) * (x2 - x1) + (py - y1) * (y2 - y1)) / line_length_squared))
-        
-        # Find closest point on line segment
-        proj_x = x1 + t * (x2 - x1)
-        proj_y = y1 + t * (y2 - y1)
-        
-        # Return distance to closest point
-        return np.sqrt((px - proj_x)**2 + (py - proj_y)**2)
+        return _p2l(float(px), float(py), float(x1), float(y1), float(x2), float(y2))
     
     def _point_near_box(self, px: int, py: int, box: EquipmentBox, threshold: int) -> bool:
         """Check if point is near or inside equipment box"""
@@ -258,48 +783,145 @@ class DrawingPreprocessor:
         
         Returns structured data about drawing topology
         """
-        print("🔍 Preprocessing drawing with OpenCV...")
+        if self._topology is not None:
+            return self._topology
+        
+        cache_key = self._topology_cache_key() if self.use_cache else None
+        cached = self._load_cached_topology(cache_key) if cache_key else None
+        if cached is not None:
+            print("🔍 Loaded drawing structure from cache")
+            main_idx = int(cached.pop('main_equipment_idx'))
+            main_idx = None if main_idx < 0 else main_idx
+            for name, arr in cached.items():
+                setattr(self, name, arr)
+            self._box_view = self._line_view = self._text_view = None
+            self._topology = self._build_topology(main_idx)
+            return self._topology
         
-        # Detect all elements
-        boxes = self.detect_equipment_boxes()
-        print(f"   Found {len(boxes)} equipment boxes")
-        
-        lines = self.detect_connection_lines()
-        print(f"   Found {len(lines)} connection lines")
+        print("🔍 Preprocessing drawing with OpenCV...")
         
-        text_regions = self.detect_text_regions()
-        print(f"   Found {len(text_regions)} text regions")
+        # Detect all elements; the passes only read self.gray, and OpenCV releases
+        # the GIL, so they run concurrently. Results are stored once all finish.
+        with ThreadPoolExecutor(max_workers=3) as ex:
+            fb = ex.submit(self._find_equipment_boxes, 1000, 50000)
+            fl = ex.submit(self._find_connection_lines, 50)
+            ft = ex.submit(self._find_text_regions)
+            boxes_arr, line_data, texts_arr = fb.result(), fl.result(), ft.result()
+        
+        self._set_boxes(boxes_arr)
+        self._set_lines(*line_data)
+        self._set_texts(texts_arr)
+        print(f"   Found {len(self.boxes_arr)} equipment boxes")
+        print(f"   Found {len(self.lines_arr)} connection lines")
+        print(f"   Found {len(self.texts_arr)} text regions")
         
         # Associate elements
         self.associate_text_with_lines()
         self.associate_lines_with_boxes()
         
-        # Build topology
-        topology = {
-            'equipment_boxes': boxes,
-            'connection_lines': lines,
-            'text_regions': text_regions,
-            'main_equipment_idx': 0 if boxes else None,  # Largest box = likely main
-        }
+        # Largest box = likely main
+        main_idx = 0 if len(self.boxes_arr) else None
         
         # Identify likely main equipment (largest box with most connections)
-        if boxes and lines:
-            box_connections = [0] * len(boxes)
-            for line in lines:
-                if line.source_box is not None:
-                    box_connections[line.source_box] += 1
-                if line.dest_box is not None:
-                    box_connections[line.dest_box] += 1
+        if len(self.boxes_arr) and len(self.lines_arr):
+            n_boxes = len(self.boxes_arr)
+            src, dst = self.line_source, self.line_dest
+            box_connections = (np.bincount(src[src >= 0], minlength=n_boxes) +
+                               np.bincount(dst[dst >= 0], minlength=n_boxes))
+            areas = self.boxes_arr[:, 2] * self.boxes_arr[:, 3]
             
-            # Main equipment = largest box with most connections
-            main_idx = max(range(len(boxes)), 
-                          key=lambda i: (box_connections[i], boxes[i].area))
-            topology['main_equipment_idx'] = main_idx
+            # Main equipment = largest box with most connections (lowest index on full ties)
+            order = np.lexsort((-np.arange(n_boxes), areas, box_connections))
+            main_idx = int(order[-1])
         
+        topology = self._build_topology(main_idx)
         print(f"   ✓ Main equipment: Box #{topology.get('main_equipment_idx', 'unknown')}")
         
+        self._topology = topology
+        if cache_key:
+            self._store_cached_topology(cache_key, {
+                'boxes_arr': self.boxes_arr,
+                'lines_arr': self.lines_arr,
+                'line_len': self.line_len,
+                'line_angle': self.line_angle,
+                'texts_arr': self.texts_arr,
+                'line_source': self.line_source,
+                'line_dest': self.line_dest,
+                'line_text': self.line_text,
+                'text_near_line': self.text_near_line,
+                'main_equipment_idx': np.int64(-1 if main_idx is None else main_idx),
+            })
         return topology
     
+    def _build_topology(self, main_idx: Optional[int]) -> Dict:
+        """Topology dict handed to the AI stages"""
+        return {
+            'equipment_boxes': self.equipment_boxes,
+            'connection_lines': self.connection_lines,
+            'text_regions': self.text_regions,
+            'main_equipment_idx': main_idx,
+        }
+    
+    @classmethod
+    def batch(cls, image_paths: List[str], workers: Optional[int] = None,
+              fast_mode: bool = False, tile_cache: bool = False, use_cache: bool = False) -> List[Dict]:
+        """
+        Analyze many drawings (e.g. every sheet in a project) on one thread pool
+        
+        Image decode of one sheet overlaps with OpenCV work on others; cv2 releases
+        the GIL for the heavy passes. Returns topologies in the order of image_paths.
+        """
+        def analyze(image_path: str) -> Dict:
+            return cls(image_path, fast_mode=fast_mode, tile_cache=tile_cache,
+                       use_cache=use_cache).analyze_drawing_structure()
+        
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as ex:
+            return list(ex.map(analyze, image_paths))
+    
+    def _topology_cache_key(self) -> str:
+        """Cache key: content hash of the drawing file, cache format version, detector modes and limits"""
+        with open(self.image_path, 'rb') as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        mode = "fast" if self.fast_mode else "full"
+        lines = "fld" if self.USE_FAST_LINE_DETECTOR and hasattr(cv2, 'ximgproc') else "hough"
+        limits = f"{self.MAX_LINE_DETECT_PIXELS}-{self.TEXT_MAX_MEAN_BRIGHTNESS}"
+        return f"v{_TOPOLOGY_CACHE_VERSION}-{mode}-{lines}-{limits}-{self._binarization_params()}-{digest}"
+    
+    @staticmethod
+    def _load_cached_topology(cache_key: str) -> Optional[Dict]:
+        """Return previously stored detection arrays, or None on miss/unreadable entry"""
+        path = _TOPOLOGY_CACHE / cache_key
+        try:
+            with np.load(path, allow_pickle=False) as npz:
+                topology = {name: npz[name] for name in npz.files}
+            os.utime(path)  # Mark as recently used for LRU eviction
+            return topology
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"   ⚠️ Ignoring unreadable topology cache entry: {e}")
+            return None
+    
+    @staticmethod
+    def _store_cached_topology(cache_key: str, payload: Dict):
+        """Persist detection arrays, then evict least recently used entries over the size cap"""
+        try:
+            _TOPOLOGY_CACHE.mkdir(mode=0o700, parents=True, exist_ok=True)
+            tmp_path = _TOPOLOGY_CACHE / f"{cache_key}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, **payload)
+            os.replace(tmp_path, _TOPOLOGY_CACHE / cache_key)
+            
+            entries = sorted((p.stat().st_mtime, p.stat().st_size, p) for p in _TOPOLOGY_CACHE.iterdir())
+            total = sum(size for _, size, _ in entries)
+            for _, size, p in entries:
+                if total <= _TOPOLOGY_CACHE_MAX_BYTES:
+                    break
+                p.unlink(missing_ok=True)
+                total -= size
+        except OSError as e:
+            print(f"   ⚠️ Could not write topology cache: {e}")
+    
     def create_annotated_image(self, output_path: str = None) -> np.ndarray:
         """
         Create annotated version of drawing showing detected elements
@@ -352,8 +974,9 @@ if __name__ == "__main__":
     
     image_path = sys.argv[1]
     
-    # Analyze structure
-    topology = preprocess_electrical_drawing(image_path)
+    # Analyze structure once; the annotated image reuses the same detections
+    preprocessor = DrawingPreprocessor(image_path)
+    topology = preprocessor.analyze_drawing_structure()
     
     print(f"\n📊 PREPROCESSING RESULTS:")
     print(f"   Equipment boxes: {len(topology['equipment_boxes'])}")
@@ -362,7 +985,5 @@ if __name__ == "__main__":
     print(f"   Main equipment: Box #{topology.get('main_equipment_idx', 'unknown')}")
     
     # Create annotated image
-    preprocessor = DrawingPreprocessor(image_path)
-    preprocessor.analyze_drawing_structure()
     annotated = preprocessor.create_annotated_image("annotated_drawing.png")
     print(f"\n✓ Saved annotated image to: annotated_drawing.png")
@@ -5,12 +5,64 @@ Format: Same as what estimators create manually
 """
 
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
+from openpyxl.xml import LXML
+from copy import copy
 from datetime import datetime
-from typing import Dict, List
+from functools import partialmethod
+from typing import Dict, List, NamedTuple, Tuple
+import logging
 import re
 
+logger = logging.getLogger(__name__)
+
+# Write-only sheets are streamed through lxml's incremental xmlfile writer;
+# without lxml openpyxl falls back to a much slower pure-Python one
+if not LXML:
+    logger.warning("lxml is not installed; Excel takeoffs will be written with the slow XML fallback")
+
+# Professional color scheme - one shared instance of each style, reused by
+# every exporter and every cell
+HEADER_FILL = PatternFill(start_color="1F4E78", end_color="1F4E78", fill_type="solid")
+SUBHEADER_FILL = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+TOTAL_FILL = PatternFill(start_color="FFC000", end_color="FFC000", fill_type="solid")
+
+TITLE_FONT = Font(bold=True, size=16)
+HEADER_FONT = Font(bold=True, color="FFFFFF", size=12)
+SUBHEADER_FONT = Font(bold=True, color="FFFFFF", size=11)
+TOTAL_FONT = Font(bold=True, size=11)
+
+THIN_BORDER = Border(
+    left=Side(style='thin'),
+    right=Side(style='thin'),
+    top=Side(style='thin'),
+    bottom=Side(style='thin')
+)
+CENTER_ALIGN = Alignment(horizontal='center')
+
+# Bucket/panel callouts in the analysis text, e.g. "200AT/225AF 225A"
+BUCKET_RE = re.compile(r'(\d+)AT.*?(\d+)A')
+
+
+class SheetSpec(NamedTuple):
+    """Layout of one material takeoff sheet (items measured in feet)"""
+    title: str
+    widths: Tuple[int, ...]
+    default_type: str
+    total_label: str
+    sum_columns: Tuple[int, ...]
+    headers: Tuple[str, ...] = ('Item', 'Size', 'Type', 'Qty', 'Unit', 'Labor Hrs', 'Notes')
+
+
+SHEET_SPECS = {
+    'wire': SheetSpec(title="WIRE & CABLE", widths=(10, 20, 15, 12, 8, 12, 30),
+                      default_type='THHN/THWN', total_label="TOTAL FOOTAGE:", sum_columns=(4, 6)),
+    'conduit': SheetSpec(title="CONDUIT & FITTINGS", widths=(10, 15, 15, 12, 8, 12, 30),
+                         default_type='EMT', total_label="TOTAL:", sum_columns=(4, 6)),
+}
+
 
 class MaterialTakeoffExporter:
     """
@@ -20,23 +72,20 @@ class MaterialTakeoffExporter:
     
     def __init__(self, project_name: str = "Construction Project"):
         self.project_name = project_name
-        self.wb = Workbook()
+        # Write-only: rows are serialized as they are appended instead of
+        # being kept as a cell tree until save()
+        self.wb = Workbook(write_only=True)
         
-        # Professional color scheme
-        self.header_fill = PatternFill(start_color="1F4E78", end_color="1F4E78", fill_type="solid")
-        self.subheader_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-        self.total_fill = PatternFill(start_color="FFC000", end_color="FFC000", fill_type="solid")
+        # Shared module styles, kept as attributes for existing callers
+        self.header_fill = HEADER_FILL
+        self.subheader_fill = SUBHEADER_FILL
+        self.total_fill = TOTAL_FILL
         
-        self.header_font = Font(bold=True, color="FFFFFF", size=12)
-        self.subheader_font = Font(bold=True, color="FFFFFF", size=11)
-        self.total_font = Font(bold=True, size=11)
+        self.header_font = HEADER_FONT
+        self.subheader_font = SUBHEADER_FONT
+        self.total_font = TOTAL_FONT
         
-        self.thin_border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
+        self.thin_border = THIN_BORDER
     
     def create_electrical_takeoff(self, analysis_result: str, drawing_name: str) -> str:
         """
@@ -47,10 +96,10 @@ class MaterialTakeoffExporter:
         # Parse the analysis to extract quantities
         equipment, wire, conduit = self._parse_electrical_analysis(analysis_result)
         
-        # Create summary sheet
-        ws_summary = self.wb.active
-        ws_summary.title = "Summary"
-        self._create_summary_sheet(ws_summary, drawing_name)
+        # Create summary sheet; it references each tab's totals row
+        ws_summary = self.wb.create_sheet("Summary")
+        self._create_summary_sheet(ws_summary, drawing_name,
+                                   [self._totals_row(len(items)) for items in (equipment, wire, conduit)])
         
         # Create equipment sheet
         ws_equipment = self.wb.create_sheet("Equipment")
@@ -70,198 +119,139 @@ class MaterialTakeoffExporter:
         
         return filename
     
-    def _create_summary_sheet(self, ws, drawing_name):
+    @staticmethod
+    def _cell(ws, value=None, font=None, fill=None, border=None, alignment=None):
+        """Write-only cell with the given shared style objects"""
+        cell = WriteOnlyCell(ws, value=value)
+        if font is not None:
+            cell.font = font
+        if fill is not None:
+            cell.fill = fill
+        if border is not None:
+            cell.border = border
+        if alignment is not None:
+            cell.alignment = alignment
+        return cell
+    
+    @staticmethod
+    def _set_column_widths(ws, widths):
+        """Column widths from A onwards; must run before the first append"""
+        for col, width in enumerate(widths, 1):
+            ws.column_dimensions[get_column_letter(col)].width = width
+    
+    def _append_title(self, ws, title, merge_range):
+        """Title banner, merged across merge_range (the row being appended)"""
+        ws.append([self._cell(ws, title, HEADER_FONT, HEADER_FILL)])
+        ws.merged_cells.add(merge_range)
+    
+    def _append_headers(self, ws, headers, border=None):
+        """Centered column header row"""
+        ws.append([self._cell(ws, header, SUBHEADER_FONT, SUBHEADER_FILL, border, CENTER_ALIGN)
+                   for header in headers])
+    
+    def _append_items(self, ws, items, columns):
+        """One bordered row per item; columns are (key, default) pairs"""
+        # Resolve the border to a style id once and copy it onto each cell,
+        # instead of looking the Border up in the style table per cell
+        bordered = self._cell(ws, border=THIN_BORDER)._style
+        for item in items:
+            row = []
+            for key, default in columns:
+                cell = WriteOnlyCell(ws, value=item.get(key, default))
+                cell._style = copy(bordered)
+                row.append(cell)
+            ws.append(row)
+    
+    @staticmethod
+    def _totals_row(item_count):
+        """Row of a takeoff tab's totals: 100, or right after the items when they run past row 99"""
+        return max(100, item_count + 3)
+    
+    def _append_totals(self, ws, label, sum_columns, item_count):
+        """Totals on _totals_row (after the title, headers and items), summing every item row"""
+        totals_row = self._totals_row(item_count)
+        for _ in range(totals_row - 3 - item_count):
+            ws.append([])
+        row = [None, self._cell(ws, label, TOTAL_FONT)]
+        for column in sum_columns:
+            letter = get_column_letter(column)
+            row.extend([None] * (column - len(row) - 1))
+            row.append(self._cell(ws, f"=SUM({letter}3:{letter}{totals_row - 1})", TOTAL_FONT))
+        ws.append(row)
+    
+    def _create_summary_sheet(self, ws, drawing_name, totals_rows):
         """Create professional summary sheet"""
+        self._set_column_widths(ws, (20, 15, 15, 40))
+        
         # Title
-        ws['A1'] = f"{self.project_name} - Material Takeoff"
-        ws['A1'].font = Font(bold=True, size=16)
+        ws.append([self._cell(ws, f"{self.project_name} - Material Takeoff", TITLE_FONT)])
+        ws.append([])
         
         # Project info
-        ws['A3'] = "Drawing:"
-        ws['B3'] = drawing_name
-        ws['A4'] = "Date:"
-        ws['B4'] = datetime.now().strftime("%Y-%m-%d %H:%M")
-        ws['A5'] = "Prepared by:"
-        ws['B5'] = "Fieldwise - Automated Takeoff"
+        ws.append(["Drawing:", drawing_name])
+        ws.append(["Date:", datetime.now().strftime("%Y-%m-%d %H:%M")])
+        ws.append(["Prepared by:", "Fieldwise - Automated Takeoff"])
+        ws.append([])
         
         # Summary header
-        ws['A7'] = "SUMMARY"
-        ws['A7'].font = self.header_font
-        ws['A7'].fill = self.header_fill
-        ws.merge_cells('A7:D7')
+        self._append_title(ws, "SUMMARY", "A7:D7")
         
         # Column headers
-        headers = ['Category', 'Item Count', 'Est. Hours', 'Notes']
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=8, column=col)
-            cell.value = header
-            cell.font = self.subheader_font
-            cell.fill = self.subheader_fill
-            cell.alignment = Alignment(horizontal='center')
+        self._append_headers(ws, ['Category', 'Item Count', 'Est. Hours', 'Notes'])
         
-        # Placeholder data
+        # Qty and labor-hour totals from each tab's totals row
+        equipment_row, wire_row, conduit_row = totals_rows
         categories = [
-            ['Equipment', '=Equipment!B100', '=Equipment!C100', 'See Equipment tab'],
-            ['Wire & Cable', '=\'Wire & Cable\'!B100', '=\'Wire & Cable\'!C100', 'See Wire tab'],
-            ['Conduit', '=\'Conduit & Fittings\'!B100', '=\'Conduit & Fittings\'!C100', 'See Conduit tab']
+            ['Equipment', f'=Equipment!D{equipment_row}', f'=Equipment!F{equipment_row}', 'See Equipment tab'],
+            ['Wire & Cable', f'=\'Wire & Cable\'!D{wire_row}', f'=\'Wire & Cable\'!F{wire_row}', 'See Wire tab'],
+            ['Conduit', f'=\'Conduit & Fittings\'!D{conduit_row}', f'=\'Conduit & Fittings\'!F{conduit_row}',
+             'See Conduit tab']
         ]
-        
-        for row, cat_data in enumerate(categories, 9):
-            for col, value in enumerate(cat_data, 1):
-                ws.cell(row=row, column=col).value = value
-        
-        # Format columns
-        ws.column_dimensions['A'].width = 20
-        ws.column_dimensions['B'].width = 15
-        ws.column_dimensions['C'].width = 15
-        ws.column_dimensions['D'].width = 40
+        for cat_data in categories:
+            ws.append(cat_data)
     
     def _create_equipment_sheet(self, ws, equipment_list):
         """Create equipment takeoff sheet"""
+        self._set_column_widths(ws, (10, 35, 15, 8, 8, 12, 30))
+        
         # Header
-        ws['A1'] = "ELECTRICAL EQUIPMENT"
-        ws['A1'].font = self.header_font
-        ws['A1'].fill = self.header_fill
-        ws.merge_cells('A1:G1')
+        self._append_title(ws, "ELECTRICAL EQUIPMENT", "A1:G1")
         
         # Column headers
-        headers = ['Item', 'Description', 'Rating', 'Qty', 'Unit', 'Labor Hrs', 'Notes']
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=2, column=col)
-            cell.value = header
-            cell.font = self.subheader_font
-            cell.fill = self.subheader_fill
-            cell.alignment = Alignment(horizontal='center')
-            cell.border = self.thin_border
+        self._append_headers(ws, ['Item', 'Description', 'Rating', 'Qty', 'Unit', 'Labor Hrs', 'Notes'],
+                             THIN_BORDER)
         
         # Add equipment items
-        row = 3
-        for item in equipment_list:
-            ws.cell(row=row, column=1).value = item.get('item_number', '')
-            ws.cell(row=row, column=2).value = item.get('description', '')
-            ws.cell(row=row, column=3).value = item.get('rating', '')
-            ws.cell(row=row, column=4).value = item.get('quantity', 1)
-            ws.cell(row=row, column=5).value = item.get('unit', 'EA')
-            ws.cell(row=row, column=6).value = item.get('labor_hours', 0)
-            ws.cell(row=row, column=7).value = item.get('notes', '')
-            
-            for col in range(1, 8):
-                ws.cell(row=row, column=col).border = self.thin_border
-            
-            row += 1
+        self._append_items(ws, equipment_list, (
+            ('item_number', ''), ('description', ''), ('rating', ''), ('quantity', 1),
+            ('unit', 'EA'), ('labor_hours', 0), ('notes', ''),
+        ))
         
         # Totals
-        ws.cell(row=100, column=2).value = "TOTAL ITEMS:"
-        ws.cell(row=100, column=2).font = self.total_font
-        ws.cell(row=100, column=4).value = f"=SUM(D3:D99)"
-        ws.cell(row=100, column=4).font = self.total_font
-        ws.cell(row=100, column=6).value = f"=SUM(F3:F99)"
-        ws.cell(row=100, column=6).font = self.total_font
-        
-        # Format columns
-        ws.column_dimensions['A'].width = 10
-        ws.column_dimensions['B'].width = 35
-        ws.column_dimensions['C'].width = 15
-        ws.column_dimensions['D'].width = 8
-        ws.column_dimensions['E'].width = 8
-        ws.column_dimensions['F'].width = 12
-        ws.column_dimensions['G'].width = 30
+        self._append_totals(ws, "TOTAL ITEMS:", (4, 6), len(equipment_list))
     
-    def _create_wire_sheet(self, ws, wire_list):
-        """Create wire & cable takeoff sheet"""
+    def _create_material_sheet(self, ws, items, spec: SheetSpec):
+        """Create a wire / conduit style takeoff sheet from its SheetSpec"""
+        self._set_column_widths(ws, spec.widths)
+        
         # Header
-        ws['A1'] = "WIRE & CABLE"
-        ws['A1'].font = self.header_font
-        ws['A1'].fill = self.header_fill
-        ws.merge_cells('A1:G1')
+        self._append_title(ws, spec.title, "A1:G1")
         
         # Column headers
-        headers = ['Item', 'Size', 'Type', 'Qty', 'Unit', 'Labor Hrs', 'Notes']
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=2, column=col)
-            cell.value = header
-            cell.font = self.subheader_font
-            cell.fill = self.subheader_fill
-            cell.alignment = Alignment(horizontal='center')
-            cell.border = self.thin_border
+        self._append_headers(ws, spec.headers, THIN_BORDER)
         
-        # Add wire items
-        row = 3
-        for item in wire_list:
-            ws.cell(row=row, column=1).value = item.get('item_number', '')
-            ws.cell(row=row, column=2).value = item.get('size', '')
-            ws.cell(row=row, column=3).value = item.get('type', 'THHN/THWN')
-            ws.cell(row=row, column=4).value = item.get('quantity', 0)
-            ws.cell(row=row, column=5).value = item.get('unit', 'FT')
-            ws.cell(row=row, column=6).value = item.get('labor_hours', 0)
-            ws.cell(row=row, column=7).value = item.get('notes', '')
-            
-            for col in range(1, 8):
-                ws.cell(row=row, column=col).border = self.thin_border
-            
-            row += 1
+        # Add material items
+        self._append_items(ws, items, (
+            ('item_number', ''), ('size', ''), ('type', spec.default_type), ('quantity', 0),
+            ('unit', 'FT'), ('labor_hours', 0), ('notes', ''),
+        ))
         
         # Totals
-        ws.cell(row=100, column=2).value = "TOTAL FOOTAGE:"
-        ws.cell(row=100, column=2).font = self.total_font
-        ws.cell(row=100, column=4).value = f"=SUM(D3:D99)"
-        ws.cell(row=100, column=4).font = self.total_font
-        ws.cell(row=100, column=6).value = f"=SUM(F3:F99)"
-        ws.cell(row=100, column=6).font = self.total_font
-        
-        # Format columns
-        ws.column_dimensions['A'].width = 10
-        ws.column_dimensions['B'].width = 20
-        ws.column_dimensions['C'].width = 15
-        ws.column_dimensions['D'].width = 12
-        ws.column_dimensions['E'].width = 8
-        ws.column_dimensions['F'].width = 12
-        ws.column_dimensions['G'].width = 30
+        self._append_totals(ws, spec.total_label, spec.sum_columns, len(items))
     
-    def _create_conduit_sheet(self, ws, conduit_list):
-        """Create conduit & fittings takeoff sheet"""
-        # Similar structure to wire sheet
-        ws['A1'] = "CONDUIT & FITTINGS"
-        ws['A1'].font = self.header_font
-        ws['A1'].fill = self.header_fill
-        ws.merge_cells('A1:G1')
-        
-        headers = ['Item', 'Size', 'Type', 'Qty', 'Unit', 'Labor Hrs', 'Notes']
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=2, column=col)
-            cell.value = header
-            cell.font = self.subheader_font
-            cell.fill = self.subheader_fill
-            cell.alignment = Alignment(horizontal='center')
-            cell.border = self.thin_border
-        
-        row = 3
-        for item in conduit_list:
-            ws.cell(row=row, column=1).value = item.get('item_number', '')
-            ws.cell(row=row, column=2).value = item.get('size', '')
-            ws.cell(row=row, column=3).value = item.get('type', 'EMT')
-            ws.cell(row=row, column=4).value = item.get('quantity', 0)
-            ws.cell(row=row, column=5).value = item.get('unit', 'FT')
-            ws.cell(row=row, column=6).value = item.get('labor_hours', 0)
-            ws.cell(row=row, column=7).value = item.get('notes', '')
-            
-            for col in range(1, 8):
-                ws.cell(row=row, column=col).border = self.thin_border
-            
-            row += 1
-        
-        ws.cell(row=100, column=2).value = "TOTAL:"
-        ws.cell(row=100, column=2).font = self.total_font
-        ws.cell(row=100, column=4).value = f"=SUM(D3:D99)"
-        ws.cell(row=100, column=4).font = self.total_font
-        
-        ws.column_dimensions['A'].width = 10
-        ws.column_dimensions['B'].width = 15
-        ws.column_dimensions['C'].width = 15
-        ws.column_dimensions['D'].width = 12
-        ws.column_dimensions['E'].width = 8
-        ws.column_dimensions['F'].width = 12
-        ws.column_dimensions['G'].width = 30
+    # Create wire & cable / conduit & fittings takeoff sheets
+    _create_wire_sheet = partialmethod(_create_material_sheet, spec=SHEET_SPECS['wire'])
+    _create_conduit_sheet = partialmethod(_create_material_sheet, spec=SHEET_SPECS['conduit'])
     
     def _parse_electrical_analysis(self, analysis: str) -> tuple:
         """
@@ -273,8 +263,8 @@ class MaterialTakeoffExporter:
         wire = []
         conduit = []
         
-        # Extract main switchboard
-        if '800A' in analysis or '800AMP' in analysis:
+        # Extract main switchboard ('800AMP' contains '800A')
+        if '800A' in analysis:
             equipment.append({
                 'item_number': 'SB-01',
                 'description': 'Main Switchboard',
@@ -285,22 +275,23 @@ class MaterialTakeoffExporter:
                 'notes': 'Main service equipment'
             })
         
-        # Extract buckets/panels
-        bucket_pattern = r'(\d+)AT.*?(\d+)A'
-        for match in re.finditer(bucket_pattern, analysis):
-            trip_rating = match.group(1)
-            equipment.append({
-                'item_number': f'PNL-{len(equipment)}',
-                'description': f'Panel, {trip_rating}A',
-                'rating': f'{trip_rating}A',
+        # Extract buckets/panels, numbered on from the switchboard
+        equipment.extend(
+            {
+                'item_number': f'PNL-{number}',
+                'description': f'Panel, {match.group(1)}A',
+                'rating': f'{match.group(1)}A',
                 'quantity': 1,
                 'unit': 'EA',
                 'labor_hours': 8,
-                'notes': f'Distribution panel'
-            })
+                'notes': 'Distribution panel'
+            }
+            for number, match in enumerate(BUCKET_RE.finditer(analysis), start=len(equipment))
+        )
         
         # Extract wire
-        if '600 kcmil' in analysis.lower() or '600kcmil' in analysis.lower():
+        lowered = analysis.lower()
+        if '600 kcmil' in lowered or '600kcmil' in lowered:
             wire.append({
                 'item_number': 'W-01',
                 'size': '600 kcmil',
@@ -311,7 +302,8 @@ class MaterialTakeoffExporter:
                 'notes': 'Main feeder - parallel sets'
             })
         
-        if '#1/0' in analysis or '1/0' in analysis:
+        # '1/0' also covers '#1/0'
+        if '1/0' in analysis:
             wire.append({
                 'item_number': 'W-02',
                 'size': '#1/0 AWG',
@@ -4,21 +4,92 @@ Production-grade text extraction with 95%+ accuracy
 This is what professional construction tech companies use
 """
 
+import asyncio
+import hashlib
 import os
 import json
+import pathlib
+import re
 from google.cloud import vision
 from google.oauth2 import service_account
 import cv2
+import numpy as np
 from typing import List, Dict, Tuple
 from dataclasses import dataclass
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
 console = Console()
 
-@dataclass
+# Vision accepts at most 16 images per batch_annotate_images request, and caps the
+# request size, so inline image bytes per request are capped as well (gs:// images
+# are sent by URI and add next to nothing)
+MAX_BATCH_IMAGES = 16
+MAX_BATCH_BYTES = 10 * 1024 * 1024
+
+# Longest side, in pixels, of drawings uploaded with downscale=True
+MAX_UPLOAD_SIDE = 4096
+
+# Opt-in (use_cache=True) on-disk cache of Vision responses for development and
+# tests, keyed by SHA-256 of the uploaded bytes, so re-running the same drawing
+# doesn't pay for another API call. Kept in a private per-user directory: an
+# entry planted by another user would silently replace a drawing's OCR text.
+_VISION_CACHE = (pathlib.Path(os.environ.get("XDG_CACHE_HOME") or pathlib.Path.home() / ".cache")
+                 / "construction_ai" / "google_vision")
+_VISION_CACHE_VERSION = 1
+_VISION_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Electrical spec patterns for extract_wire_specifications
+WIRE_RE = re.compile(r'[\(]?\d+[\)]?\s*#?[\d/]+\s*(AWG|kcmil|KCMIL|MCM|kcm)?', re.IGNORECASE)
+CONDUIT_RE = re.compile(r'\d+[-\s]?\d*/?\d*["\s]*(EMT|RGS|IMC|PVC|RMC|EMT\b)', re.IGNORECASE)
+GROUND_RE = re.compile(r'#?\d+/?[\d/]*\s*(G\b|GND|GROUND)', re.IGNORECASE)
+EQUIPMENT_RE = re.compile(r'(SWITCHBOARD|SWBD|PANEL|PP-\d+|LP-\d+|RP-\d+|MSB|MDP|SB)', re.IGNORECASE)
+
+# Literal text each pattern above cannot match without (upper-cased; "SB"
+# also covers "MSB", "G" covers "GND" and "GROUND"). A text region only goes
+# through a pattern's regex if one of its keywords is present. WIRE_RE is
+# purely numeric, so it has no keywords and always runs.
+SPEC_KEYWORDS = {
+    'conduit_sizes': ('EMT', 'RGS', 'IMC', 'PVC', 'RMC'),
+    'ground_wires': ('G',),
+    'equipment_labels': ('SWITCHBOARD', 'SWBD', 'PANEL', 'PP-', 'LP-', 'RP-', 'MDP', 'SB'),
+}
+
+
+def _build_spec_automaton():
+    """One Aho-Corasick automaton over every keyword (None without pyahocorasick)"""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for category, keywords in SPEC_KEYWORDS.items():
+        for keyword in keywords:
+            automaton.add_word(keyword, category)
+    automaton.make_automaton()
+    return automaton
+
+
+SPEC_AUTOMATON = _build_spec_automaton()
+
+
+def spec_candidates(text: str) -> set:
+    """Spec categories whose keywords appear in text, found in one pass"""
+    upper = text.upper()
+    if SPEC_AUTOMATON is not None:
+        return {category for _, category in SPEC_AUTOMATON.iter(upper)}
+    return {category for category, keywords in SPEC_KEYWORDS.items()
+            if any(keyword in upper for keyword in keywords)}
+
+@dataclass(slots=True, frozen=True)
 class ExtractedText:
-    """Text detected by Google Vision with location and confidence"""
+    """
+    Text detected by Google Vision with location and confidence.
+    Immutable and hashable; text_assembly.TextTable.from_extracted gives the
+    structure-of-arrays view for vectorized geometry.
+    """
     text: str
     x: int
     y: int
@@ -41,12 +112,21 @@ class GoogleVisionOCR:
     Best accuracy for technical drawings
     """
     
-    def __init__(self, credentials_path: str = "google-vision-key.json"):
+    def __init__(self, credentials_path: str = "google-vision-key.json", downscale: bool = False,
+                 use_cache: bool = False):
         """
         Initialize Google Vision client
         Reads credentials from GOOGLE_CREDENTIALS_JSON env var (production)
         or falls back to a local file (local development)
+        
+        downscale: shrink drawings whose longest side exceeds MAX_UPLOAD_SIDE
+        before upload (smaller transfer; the smallest text may be lost).
+        Coordinates are always returned in the original image's pixels.
+        use_cache: reuse stored responses for drawings already sent (see _VISION_CACHE);
+        meant for development and tests, off by default
         """
+        self.downscale = downscale
+        self.use_cache = use_cache
         console.print("[cyan]☁️  Initializing Google Cloud Vision...[/cyan]")
         
         # Try environment variable first (production/Railway)
@@ -76,7 +156,8 @@ class GoogleVisionOCR:
                 f"or place a key file at: {credentials_path}"
             )
         
-        # Create Vision API client
+        # Create Vision API client (credentials kept for the async client)
+        self.credentials = credentials
         self.client = vision.ImageAnnotatorClient(credentials=credentials)
         
         console.print("[green]✓ Google Vision ready[/green]")
@@ -93,67 +174,249 @@ class GoogleVisionOCR:
         """
         console.print(f"[cyan]📄 Processing with Google Vision: {image_path}[/cyan]")
         
-        # Read image
-        with open(image_path, 'rb') as image_file:
-            content = image_file.read()
-        
-        image = vision.Image(content=content)
+        image, scale = self._read_image(image_path)
+        [response] = self._cached_responses([image])
         
         # Call Google Vision API
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=console,
-        ) as progress:
-            task = progress.add_task("Analyzing drawing with Google Vision...", total=None)
+        if response is None:
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                console=console,
+            ) as progress:
+                task = progress.add_task("Analyzing drawing with Google Vision...", total=None)
+                
+                # Request DOCUMENT_TEXT_DETECTION (best for technical documents)
+                response = self.client.document_text_detection(image=image)
+                
+                progress.update(task, completed=True)
+            self._store_cached_response(image, response)
+        else:
+            console.print("[green]✓ Loaded Google Vision response from cache[/green]")
+        
+        extracted_texts = self._parse_response(response, scale)
+        
+        console.print(f"[green]✓ Extracted {len(extracted_texts)} text regions[/green]")
+        return extracted_texts
+    
+    def extract_text_from_images(self, image_paths: List[str]) -> List[List[ExtractedText]]:
+        """
+        Extract text from several drawings (e.g. the pages of one PDF),
+        sending up to MAX_BATCH_IMAGES images (and MAX_BATCH_BYTES) per Vision request
+        
+        Args:
+            image_paths: Paths to drawing images
+        
+        Returns:
+            One list of ExtractedText objects per image, in input order
+        """
+        console.print(f"[cyan]📄 Processing {len(image_paths)} drawings with Google Vision[/cyan]")
+        
+        feature = vision.Feature(type_=vision.Feature.Type.DOCUMENT_TEXT_DETECTION)
+        results = []
+        for start in range(0, len(image_paths), MAX_BATCH_IMAGES):
+            images, scales = zip(*map(self._read_image, image_paths[start:start + MAX_BATCH_IMAGES]))
+            responses = self._cached_responses(images)
+            misses = [i for i, response in enumerate(responses) if response is None]
+            for request_idx in self._request_batches(images, misses):
+                requests = [vision.AnnotateImageRequest(image=images[i], features=[feature]) for i in request_idx]
+                batch = self.client.batch_annotate_images(requests=requests)
+                for i, response in zip(request_idx, batch.responses):
+                    responses[i] = response
+                    self._store_cached_response(images[i], response)
+            results.extend(map(self._parse_response, responses, scales))
+        
+        console.print(f"[green]✓ Extracted {sum(map(len, results))} text regions[/green]")
+        return results
+    
+    async def extract_text_from_images_async(self, image_paths: List[str]) -> List[List[ExtractedText]]:
+        """
+        Async extract_text_from_images: files are read in worker threads and
+        every batch request is in flight at the same time, so one
+        request's network wait overlaps the others
+        
+        Args:
+            image_paths: Paths to drawing images
+        
+        Returns:
+            One list of ExtractedText objects per image, in input order
+        """
+        # gRPC asyncio clients belong to the running event loop, so create one per call;
+        # the context manager closes its channel when the call finishes
+        async with vision.ImageAnnotatorAsyncClient(credentials=self.credentials) as client:
+            feature = vision.Feature(type_=vision.Feature.Type.DOCUMENT_TEXT_DETECTION)
             
-            # Request DOCUMENT_TEXT_DETECTION (best for technical documents)
-            response = self.client.document_text_detection(image=image)
+            async def annotate(paths):
+                loaded = await asyncio.gather(*(asyncio.to_thread(self._read_image, path) for path in paths))
+                images, scales = zip(*loaded)
+                responses = await asyncio.to_thread(self._cached_responses, images)
+                misses = [i for i, response in enumerate(responses) if response is None]
+                
+                async def send(request_idx):
+                    requests = [vision.AnnotateImageRequest(image=images[i], features=[feature]) for i in request_idx]
+                    batch = await client.batch_annotate_images(requests=requests)
+                    for i, response in zip(request_idx, batch.responses):
+                        responses[i] = response
+                        await asyncio.to_thread(self._store_cached_response, images[i], response)
+                
+                await asyncio.gather(*map(send, self._request_batches(images, misses)))
+                return list(map(self._parse_response, responses, scales))
             
-            progress.update(task, completed=True)
+            batches = await asyncio.gather(*(
+                annotate(image_paths[start:start + MAX_BATCH_IMAGES])
+                for start in range(0, len(image_paths), MAX_BATCH_IMAGES)
+            ))
+            return [texts for batch in batches for texts in batch]
+    
+    @staticmethod
+    def _request_batches(images, indices: List[int]) -> List[List[int]]:
+        """
+        Split indices of images to send into requests of at most MAX_BATCH_IMAGES
+        images and MAX_BATCH_BYTES of inline content (an oversized image goes alone)
+        """
+        batches, size = [], 0
+        for i in indices:
+            content_size = len(images[i].content)
+            if not batches or len(batches[-1]) == MAX_BATCH_IMAGES or size + content_size > MAX_BATCH_BYTES:
+                batches.append([])
+                size = 0
+            batches[-1].append(i)
+            size += content_size
+        return batches
+    
+    def _read_image(self, image_path: str) -> Tuple[vision.Image, float]:
+        """
+        Load a drawing for upload
         
+        Returns: (image, scale) - multiply response coordinates by scale to
+        get back to the original image's pixels
+        """
+        # Drawings already in Cloud Storage are read by Vision directly: no upload
+        if image_path.startswith('gs://'):
+            return vision.Image(source=vision.ImageSource(image_uri=image_path)), 1.0
+        
+        with open(image_path, 'rb') as image_file:
+            content = image_file.read()
+        
+        scale = 1.0
+        if self.downscale:
+            image = cv2.imdecode(np.frombuffer(content, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if image is not None and max(image.shape[:2]) > MAX_UPLOAD_SIDE:
+                height, width = image.shape[:2]
+                scale = max(height, width) / MAX_UPLOAD_SIDE
+                image = cv2.resize(image, (round(width / scale), round(height / scale)),
+                                   interpolation=cv2.INTER_AREA)
+                # Keep the source format: line-art PNGs compress better as PNG than JPEG
+                if image_path.lower().endswith(('.jpg', '.jpeg')):
+                    _, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 90])
+                else:
+                    _, buffer = cv2.imencode('.png', image)
+                content = buffer.tobytes()
+        
+        return vision.Image(content=content), scale
+    
+    @staticmethod
+    def _cache_key(image: vision.Image) -> str:
+        """Cache key: cache format version, feature and SHA-256 of the uploaded bytes"""
+        return f"v{_VISION_CACHE_VERSION}-document_text-{hashlib.sha256(image.content).hexdigest()}"
+    
+    def _cached_responses(self, images) -> list:
+        """Stored response for each image, None on a miss (or with the cache off)"""
+        if not self.use_cache:
+            return [None] * len(images)
+        responses = []
+        for image in images:
+            if not image.content:  # gs:// source: the object can change under the same URI
+                responses.append(None)
+                continue
+            path = _VISION_CACHE / self._cache_key(image)
+            try:
+                response = vision.AnnotateImageResponse.deserialize(path.read_bytes())
+                os.utime(path)  # Mark as recently used for LRU eviction
+            except FileNotFoundError:
+                response = None
+            except Exception as e:
+                console.print(f"[yellow]⚠️ Ignoring unreadable Vision cache entry: {e}[/yellow]")
+                response = None
+            responses.append(response)
+        return responses
+    
+    def _store_cached_response(self, image: vision.Image, response):
+        """Persist a successful response, then evict least recently used entries over the size cap"""
+        if not self.use_cache or not image.content or response.error.message:
+            return
+        try:
+            _VISION_CACHE.mkdir(mode=0o700, parents=True, exist_ok=True)
+            cache_key = self._cache_key(image)
+            tmp_path = _VISION_CACHE / f"{cache_key}.{os.getpid()}.tmp"
+            tmp_path.write_bytes(vision.AnnotateImageResponse.serialize(response))
+            os.replace(tmp_path, _VISION_CACHE / cache_key)
+            
+            entries = sorted((p.stat().st_mtime, p.stat().st_size, p) for p in _VISION_CACHE.iterdir())
+            total = sum(size for _, size, _ in entries)
+            for _, size, p in entries:
+                if total <= _VISION_CACHE_MAX_BYTES:
+                    break
+                p.unlink(missing_ok=True)
+                total -= size
+        except OSError as e:
+            console.print(f"[yellow]⚠️ Could not write Vision cache: {e}[/yellow]")
+    
+    @staticmethod
+    def _parse_response(response, scale: float = 1.0) -> List[ExtractedText]:
+        """
+        Paragraph-level ExtractedText from one DOCUMENT_TEXT_DETECTION response,
+        coordinates multiplied by scale (see _read_image)
+        """
         if response.error.message:
             raise Exception(f"Google Vision API error: {response.error.message}")
         
-        # Parse results
-        extracted_texts = []
+        # Parse results: text and confidence per paragraph, boxes in one array
+        para_texts = []
+        para_confidences = []
+        para_vertices = []
         
         # Get document-level text detection (better for technical docs)
         if response.full_text_annotation:
             for page in response.full_text_annotation.pages:
                 for block in page.blocks:
                     for paragraph in block.paragraphs:
-                        # Build paragraph text
-                        para_text = ""
-                        para_confidence = 0
-                        
-                        for word in paragraph.words:
-                            word_text = ''.join([symbol.text for symbol in word.symbols])
-                            para_text += word_text + " "
-                            para_confidence += word.confidence
-                        
-                        # Get bounding box
-                        vertices = paragraph.bounding_box.vertices
-                        x_coords = [v.x for v in vertices]
-                        y_coords = [v.y for v in vertices]
-                        
-                        x = min(x_coords)
-                        y = min(y_coords)
-                        width = max(x_coords) - x
-                        height = max(y_coords) - y
+                        words = paragraph.words
+                        if not words:
+                            continue
                         
-                        avg_confidence = para_confidence / len(paragraph.words) if paragraph.words else 0
+                        # Build paragraph text
+                        para_text = ' '.join(
+                            ''.join(symbol.text for symbol in word.symbols) for word in words
+                        ).strip()
                         
-                        if para_text.strip():
-                            extracted_texts.append(ExtractedText(
-                                text=para_text.strip(),
-                                x=x, y=y,
-                                width=width,
-                                height=height,
-                                confidence=avg_confidence
-                            ))
+                        if para_text:
+                            para_texts.append(para_text)
+                            para_confidences.append(sum(word.confidence for word in words) / len(words))
+                            para_vertices.append([(v.x, v.y) for v in paragraph.bounding_box.vertices])
+        
+        if not para_texts:
+            return []
+        
+        # Bounding boxes: (P, 4, 2) vertices -> per-paragraph min/max corners
+        vertices = np.array(para_vertices, dtype=np.int64)
+        if scale != 1.0:
+            vertices = np.rint(vertices * scale).astype(np.int64)
+        mins = vertices.min(axis=1)
+        sizes = vertices.max(axis=1) - mins
+        
+        extracted_texts = [
+            ExtractedText(
+                text=text,
+                x=x, y=y,
+                width=width,
+                height=height,
+                confidence=confidence
+            )
+            for text, confidence, (x, y), (width, height)
+            in zip(para_texts, para_confidences, mins.tolist(), sizes.tolist())
+        ]
         
-        console.print(f"[green]✓ Extracted {len(extracted_texts)} text regions[/green]")
         return extracted_texts
     
     def extract_wire_specifications(self, texts: List[ExtractedText]) -> Dict[str, List[str]]:
@@ -165,8 +428,6 @@ class GoogleVisionOCR:
         - conduit_sizes: ["1-1/2 EMT", "2 RGS", etc.]
         - equipment_labels: ["SWITCHBOARD", "PP-1", etc.]
         """
-        import re
-        
         specs = {
             'wire_sizes': [],
             'conduit_sizes': [],
@@ -175,34 +436,25 @@ class GoogleVisionOCR:
             'all_text': []
         }
         
-        # Patterns for electrical specs
-        wire_pattern = r'[\(]?\d+[\)]?\s*#?[\d/]+\s*(AWG|kcmil|KCMIL|MCM|kcm)?'
-        conduit_pattern = r'\d+[-\s]?\d*/?\d*["\s]*(EMT|RGS|IMC|PVC|RMC|EMT\b)'
-        ground_pattern = r'#?\d+/?[\d/]*\s*(G\b|GND|GROUND)'
-        equipment_pattern = r'(SWITCHBOARD|SWBD|PANEL|PP-\d+|LP-\d+|RP-\d+|MSB|MDP|SB)'
-        
         for text_obj in texts:
             text = text_obj.text
             specs['all_text'].append(text)
+            candidates = spec_candidates(text)
             
             # Find wire sizes
-            wire_matches = re.findall(wire_pattern, text, re.IGNORECASE)
-            if wire_matches:
+            if WIRE_RE.search(text):
                 specs['wire_sizes'].append(text)
             
             # Find conduit sizes
-            conduit_matches = re.findall(conduit_pattern, text, re.IGNORECASE)
-            if conduit_matches:
+            if 'conduit_sizes' in candidates and CONDUIT_RE.search(text):
                 specs['conduit_sizes'].append(text)
             
             # Find ground wires
-            ground_matches = re.findall(ground_pattern, text, re.IGNORECASE)
-            if ground_matches:
+            if 'ground_wires' in candidates and GROUND_RE.search(text):
                 specs['ground_wires'].append(text)
             
             # Find equipment labels
-            equipment_matches = re.findall(equipment_pattern, text, re.IGNORECASE)
-            if equipment_matches:
+            if 'equipment_labels' in candidates and EQUIPMENT_RE.search(text):
                 specs['equipment_labels'].append(text)
         
         return specs
@@ -7,10 +7,10 @@ import os
 import anthropic
 import base64
 import json
+import math
 from PIL import Image
 import io
 from typing import Dict, List, Optional, Tuple
-import numpy as np
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
@@ -177,13 +177,13 @@ class IntegratedDrawingAgent:
         line_length_squared = (x2 - x1)**2 + (y2 - y1)**2
 
         if line_length_squared == 0:
-            return np.sqrt((px - x1)**2 + (py - y1)**2)
+            return math.hypot(px - x1, py - y1)
 
         t = max(0, min(1, ((px - x1) * (x2 - x1) + (py - y1) * (y2 - y1)) / line_length_squared))
         proj_x = x1 + t * (x2 - x1)
         proj_y = y1 + t * (y2 - y1)
 
-        return np.sqrt((px - proj_x)**2 + (py - proj_y)**2)
+        return math.hypot(px - proj_x, py - proj_y)
 
     def analyze(self) -> str:
         """
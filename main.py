@@ -5,7 +5,7 @@ Backend API - Complete Production Version
 
 from fastapi import FastAPI, File, UploadFile, HTTPException, Query, Request, Form
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Optional
 import PyPDF2
@@ -26,7 +26,7 @@ from auth import hash_password, verify_password, create_token, decode_token, get
 # NEC + Timecard
 from nec_validator import NECValidator, NECVersion, NEC_QUICK_REFERENCE
 from timecard_scanner import TimeCardScanner
-from timecard_excel import create_timecard_excel
+from timecard_excel import create_timecard_excel_file
 
 # Integrated drawing agent
 from integrated_agent import IntegratedDrawingAgent
@@ -468,9 +468,9 @@ async def process_timecards(files: List[UploadFile] = File(...)):
             continue
 
     try:
-        excel_bytes = create_timecard_excel(fte_entries, contractor_entries)
-        return Response(
-            content=excel_bytes,
+        excel_file = create_timecard_excel_file(fte_entries, contractor_entries)
+        return StreamingResponse(
+            iter_file_chunks(excel_file),
             media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             headers={"Content-Disposition": f"attachment; filename=timecards_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"}
         )
@@ -482,6 +482,15 @@ async def process_timecards(files: List[UploadFile] = File(...)):
 # HELPERS
 # ═══════════════════════════════════════════════════════════════
 
+def iter_file_chunks(file_obj, chunk_size: int = 64 * 1024):
+    """Yield a file's contents in chunks, closing it when done"""
+    try:
+        while chunk := file_obj.read(chunk_size):
+            yield chunk
+    finally:
+        file_obj.close()
+
+
 def extract_text_from_pdf(file_bytes: bytes) -> str:
     try:
         pdf_file = io.BytesIO(file_bytes)
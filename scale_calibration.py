@@ -4,14 +4,29 @@ Enables accurate distance measurements for material takeoffs
 User calibrates like Bluebeam: draw line on known distance
 """
 
-import numpy as np
-from typing import Tuple, List
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING, Tuple, List
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Feet per unit of the known distance passed to DrawingScale.calibrate
+UNIT_TO_FEET = {
+    "feet": 1.0,
+    "inches": 1 / 12,
+    "meters": 3.28084,
+    "cm": 0.0328084,
+    "mm": 0.00328084,
+}
 
 class DrawingScale:
     """Manages scale calibration and distance measurements"""
     
     def __init__(self):
         self.pixels_per_foot = None
+        self._inv_ppf = None  # feet per pixel, so measurements multiply instead of divide
         self.calibrated = False
     
     def calibrate(self, x1: int, y1: int, x2: int, y2: int, known_distance: float, unit: str = "feet"):
@@ -22,15 +37,15 @@ class DrawingScale:
             x1, y1: Start point of reference line (pixels)
             x2, y2: End point of reference line (pixels)
             known_distance: Actual distance this line represents
-            unit: "feet", "meters", etc.
+            unit: Any key of UNIT_TO_FEET ("feet", "meters", etc.)
         """
-        pixel_distance = np.sqrt((x2 - x1)**2 + (y2 - y1)**2)
+        if unit not in UNIT_TO_FEET:
+            raise ValueError(f"Unknown unit {unit!r}; expected one of {', '.join(UNIT_TO_FEET)}")
         
-        if unit == "feet":
-            self.pixels_per_foot = pixel_distance / known_distance
-        elif unit == "meters":
-            self.pixels_per_foot = pixel_distance / (known_distance * 3.28084)  # Convert to feet
+        pixel_distance = math.hypot(x2 - x1, y2 - y1)
+        self.pixels_per_foot = pixel_distance / (known_distance * UNIT_TO_FEET[unit])  # Convert to feet
         
+        self._inv_ppf = 1.0 / self.pixels_per_foot
         self.calibrated = True
         print(f"✓ Scale calibrated: {self.pixels_per_foot:.2f} pixels per foot")
     
@@ -43,24 +58,51 @@ class DrawingScale:
         if not self.calibrated:
             return None
         
-        pixel_distance = np.sqrt((x2 - x1)**2 + (y2 - y1)**2)
-        return pixel_distance / self.pixels_per_foot
+        pixel_distance = math.hypot(x2 - x1, y2 - y1)
+        return pixel_distance * self._inv_ppf
+    
+    def within_length(self, x1: int, y1: int, x2: int, y2: int, feet_max: float) -> bool:
+        """
+        Check whether two points are at most feet_max apart, comparing
+        squared pixel distances so no square root is taken
+        
+        Returns: True/False (or None if not calibrated)
+        """
+        if not self.calibrated:
+            return None
+        
+        max_pixels = feet_max * self.pixels_per_foot
+        return (x2 - x1)**2 + (y2 - y1)**2 <= max_pixels * max_pixels
     
     def measure_line_lengths(self, connection_lines: List) -> dict:
         """
         Measure all connection lines in drawing
         
+        Accepts ConnectionLine objects or an (N, 4) endpoint array
+        (e.g. DrawingPreprocessor.lines_arr).
+        
         Returns: {line_index: distance_in_feet}
         """
         if not self.calibrated:
             return {}
         
-        measurements = {}
-        for idx, line in enumerate(connection_lines):
-            distance = self.measure_distance(line.x1, line.y1, line.x2, line.y2)
-            measurements[idx] = round(distance, 1)
+        import numpy as np  # Deferred so importing this module stays cheap
         
-        return measurements
+        lines = _lines_to_arrays(connection_lines)
+        distances = np.hypot(lines[:, 2] - lines[:, 0], lines[:, 3] - lines[:, 1]) * self._inv_ppf
+        # Builtin round, not np.round: they disagree on some halfway values
+        return dict(enumerate(round(d, 1) for d in distances.tolist()))
+
+
+def _lines_to_arrays(connection_lines: List) -> np.ndarray:
+    """Pack line endpoints into an (N, 4) x1, y1, x2, y2 array"""
+    import numpy as np
+    
+    if isinstance(connection_lines, np.ndarray):
+        return connection_lines.reshape(-1, 4).astype(np.float64, copy=False)
+    
+    return np.array([(line.x1, line.y1, line.x2, line.y2) for line in connection_lines],
+                    dtype=np.float64).reshape(-1, 4)
 
 
 # Example usage for web interface:
@@ -4,12 +4,109 @@ Fixes OCR fragmentation by intelligently grouping text into logical blocks
 This is what makes the difference between 90% and 100% accuracy
 """
 
+from __future__ import annotations
+
+import functools
+import os
+import re
 import numpy as np
-from typing import List, Dict, Tuple
+from typing import TYPE_CHECKING, List, Dict, Tuple
 from dataclasses import dataclass
-from google_vision_ocr import ExtractedText
 
-@dataclass
+if TYPE_CHECKING:
+    # Annotation only; importing google_vision_ocr pulls in the Cloud Vision client
+    from google_vision_ocr import ExtractedText
+
+# Equipment spec patterns, compiled once for every extract_equipment_specs call
+BUCKET_RE = re.compile(r'(?P<frame>\d+)\s*AF\s*/\s*(?P<trip>\d+)\s*(?P<trip_type>AT|AS|AE)', re.IGNORECASE)
+WIRE_RE = re.compile(r'(\d+)\s*(?:kcmil|KCMIL|MCM)', re.IGNORECASE)
+PANEL_RE = re.compile(r'(PP|LP|RP|DP|MDP)-?\d+', re.IGNORECASE)
+RATING_RE = re.compile(r'(\d+)\s*(?:A|AMP|KVA|HP|TON)', re.IGNORECASE)
+
+# Upper-case keyword checks every match of a pattern passes (a bucket needs
+# both the AF frame and an AT/AS/AE trip); a page whose upper-cased text
+# fails any of them skips that pattern's scan
+SPEC_MARKERS = {
+    BUCKET_RE: (re.compile('AF'), re.compile('A[TSE]')),
+    WIRE_RE: (re.compile('CM'),),
+    PANEL_RE: (re.compile('[PLRD]P'),),
+    RATING_RE: (re.compile('A|HP|TON'),),
+}
+
+# Separates block texts in the buffer extract_equipment_specs scans. None of
+# the patterns can consume it (unlike \x1f, which \s matches), so a match
+# never spans two blocks.
+BLOCK_SEPARATOR = '\0'
+
+
+def _match_blocks(pattern: re.Pattern, buffer: str, upper: str, starts: np.ndarray) -> Tuple[list, list]:
+    """Every match of pattern in buffer, and the index of the block each one starts in"""
+    if not all(marker.search(upper) for marker in SPEC_MARKERS[pattern]):
+        return [], []
+    matches = list(pattern.finditer(buffer))
+    if not matches:
+        return [], []
+    block_idx = np.searchsorted(starts, [m.start() for m in matches], side='right') - 1
+    return matches, block_idx.tolist()
+
+
+def _table_ranges(first_x, col_counts, can_start, alignment_threshold):
+    """
+    (start, stop) line ranges of detected tables
+    
+    A table is 3+ consecutive lines (at most 20) where each new line's
+    column count is within 2 of, and its first x within alignment_threshold
+    of, the running averages over the rows collected so far. Averages are
+    kept as running sums, so each row is an O(1) check. Lines with
+    can_start False (not aligned with the next line) are skipped as starts.
+    """
+    n = len(first_x)
+    ranges = np.empty((n // 3, 2), dtype=np.int64)
+    count = 0
+    
+    i = 0
+    while i < n:
+        if not can_start[i]:
+            i += 1
+            continue
+        
+        sum_x = first_x[i]
+        sum_cols = col_counts[i]
+        rows = 1
+        j = i + 1
+        stop = min(i + 20, n)
+        while j < stop:
+            if abs(col_counts[j] - sum_cols / rows) > 2:
+                break
+            if abs(first_x[j] - sum_x / rows) > alignment_threshold:
+                break
+            sum_x += first_x[j]
+            sum_cols += col_counts[j]
+            rows += 1
+            j += 1
+        
+        if rows >= 3:
+            ranges[count, 0] = i
+            ranges[count, 1] = j
+            count += 1
+            i = j  # Skip past this table
+        else:
+            i += 1
+    
+    return ranges[:count]
+
+
+@functools.lru_cache(maxsize=None)
+def _table_ranges_kernel():
+    """_table_ranges, njit-compiled when numba is installed (imported on first table scan)"""
+    try:
+        from numba import njit
+    except ImportError:
+        return _table_ranges
+    return njit(cache=True)(_table_ranges)
+
+
+@dataclass(slots=True)
 class TextBlock:
     """Assembled block of related text"""
     texts: List[ExtractedText]
@@ -21,6 +118,54 @@ class TextBlock:
     confidence: float
     is_table_row: bool = False
     row_number: int = None
+    combined_upper: str = None  # combined_text.upper(), cached for spec extraction
+
+
+@dataclass(slots=True)
+class TextTable:
+    """
+    Structure-of-arrays view of OCR fragments: one row per ExtractedText,
+    geometry in parallel NumPy arrays so grouping and bounding boxes are
+    vector ops instead of per-object attribute lookups
+    """
+    items: List[ExtractedText]  # Source objects, kept for TextBlock.texts
+    text: List[str]
+    x: np.ndarray
+    y: np.ndarray
+    w: np.ndarray
+    h: np.ndarray
+    cx: np.ndarray
+    cy: np.ndarray
+    conf: np.ndarray
+    
+    @classmethod
+    def from_extracted(cls, texts: List[ExtractedText]) -> "TextTable":
+        n = len(texts)
+        x = np.fromiter((t.x for t in texts), dtype=np.int64, count=n)
+        y = np.fromiter((t.y for t in texts), dtype=np.int64, count=n)
+        w = np.fromiter((t.width for t in texts), dtype=np.int64, count=n)
+        h = np.fromiter((t.height for t in texts), dtype=np.int64, count=n)
+        return cls(
+            items=list(texts),
+            text=[t.text for t in texts],
+            x=x, y=y, w=w, h=h,
+            cx=x + w // 2,
+            cy=y + h // 2,
+            conf=np.fromiter((t.confidence for t in texts), dtype=np.float64, count=n)
+        )
+    
+    def __len__(self) -> int:
+        return len(self.items)
+    
+    def take(self, order: np.ndarray) -> "TextTable":
+        """Rows reordered (or subset) by an index array"""
+        order = order.tolist()
+        return TextTable(
+            items=[self.items[i] for i in order],
+            text=[self.text[i] for i in order],
+            x=self.x[order], y=self.y[order], w=self.w[order], h=self.h[order],
+            cx=self.cx[order], cy=self.cy[order], conf=self.conf[order]
+        )
 
 
 class SmartTextAssembler:
@@ -52,20 +197,25 @@ class SmartTextAssembler:
             return []
         
         # Sort by position (top to bottom, left to right)
-        sorted_texts = sorted(texts, key=lambda t: (t.y, t.x))
+        table = TextTable.from_extracted(texts)
+        table = table.take(np.lexsort((table.x, table.y)))
         
         # Step 1: Group into horizontal lines
-        lines = self._group_into_lines(sorted_texts)
+        line_indices = self._line_indices(table)
+        
+        # Bounding box, confidence and combined text of every line in one pass over the page
+        line_bounds = self._line_bounds(table, line_indices)
+        line_texts = self._line_texts(table, line_indices)
         
         # Step 2: Detect tables
-        tables = self._detect_tables(lines)
+        tables = self._detect_tables(table, line_indices, line_bounds, line_texts)
         
         # Step 3: Group non-table lines into blocks
-        blocks = self._group_lines_into_blocks(lines, tables)
+        blocks = self._group_lines_into_blocks(table, line_indices, tables, line_bounds, line_texts)
         
         # Step 4: Add table rows as blocks
-        for table in tables:
-            blocks.extend(table)
+        for table_blocks in tables:
+            blocks.extend(table_blocks)
         
         return blocks
     
@@ -77,125 +227,107 @@ class SmartTextAssembler:
         - If two text regions have y-coordinates within threshold, same line
         - Sort left-to-right within line
         """
-        if not texts:
+        table = TextTable.from_extracted(texts)
+        return [[table.items[i] for i in idx] for idx in self._line_indices(table)]
+    
+    def _line_indices(self, table: TextTable) -> List[np.ndarray]:
+        """Row indices into table for each line, each sorted left-to-right"""
+        if not len(table):
             return []
         
-        lines = []
-        current_line = [texts[0]]
+        # Line breaks wherever consecutive centers jump by more than the threshold
+        is_break = np.abs(np.diff(table.cy)) > self.vertical_threshold
+        line_id = np.concatenate(([0], np.cumsum(is_break)))
         
-        for text in texts[1:]:
-            # Check if this text is on the same line as current_line
-            last_text = current_line[-1]
-            
-            # Calculate y-distance between centers
-            y_dist = abs(text.center_y - last_text.center_y)
-            
-            if y_dist <= self.vertical_threshold:
-                # Same line - add to current
-                current_line.append(text)
-            else:
-                # New line - save current and start new
-                # Sort current line left-to-right
-                current_line.sort(key=lambda t: t.x)
-                lines.append(current_line)
-                current_line = [text]
-        
-        # Don't forget last line
-        if current_line:
-            current_line.sort(key=lambda t: t.x)
-            lines.append(current_line)
-        
-        return lines
+        # One stable sort orders every line left-to-right at once
+        order = np.lexsort((table.x, line_id))
+        return np.split(order, np.flatnonzero(is_break) + 1)
     
-    def _detect_tables(self, lines: List[List[ExtractedText]]) -> List[List[TextBlock]]:
-        """
-        Detect table structures (like switchboard schedules)
+    @staticmethod
+    def _line_bounds(table: TextTable, line_indices: List[np.ndarray]) -> List[Tuple]:
+        """(x, y, width, height, avg_confidence) of each line, reduced over all lines at once"""
+        if not line_indices:
+            return []
         
-        Tables have:
-        - Multiple rows (3+)
-        - Aligned columns (x-coordinates similar)
-        - Consistent spacing
-        """
-        tables = []
+        counts = np.array([len(idx) for idx in line_indices])
+        starts = np.concatenate(([0], np.cumsum(counts[:-1])))
+        rows = np.concatenate(line_indices)
         
-        i = 0
-        while i < len(lines):
-            # Try to detect table starting at this line
-            table_rows = self._extract_table_rows(lines, i)
-            
-            if len(table_rows) >= 3:  # Valid table (3+ rows)
-                # Convert to TextBlocks
-                table_blocks = []
-                for row_num, row in enumerate(table_rows):
-                    block = self._merge_line_into_block(row)
-                    block.is_table_row = True
-                    block.row_number = row_num
-                    table_blocks.append(block)
-                
-                tables.append(table_blocks)
-                i += len(table_rows)  # Skip past this table
-            else:
-                i += 1
+        left = np.minimum.reduceat(table.x[rows], starts)
+        top = np.minimum.reduceat(table.y[rows], starts)
+        right = np.maximum.reduceat(table.x[rows] + table.w[rows], starts)
+        bottom = np.maximum.reduceat(table.y[rows] + table.h[rows], starts)
+        confidence = np.add.reduceat(table.conf[rows], starts) / counts
         
-        return tables
+        return list(zip(left.tolist(), top.tolist(), (right - left).tolist(),
+                        (bottom - top).tolist(), confidence.tolist()))
     
-    def _extract_table_rows(self, lines: List[List[ExtractedText]], start_idx: int) -> List[List[ExtractedText]]:
-        """
-        Try to extract table rows starting from start_idx
-        
-        Returns list of rows if table detected, else empty list
-        """
-        if start_idx >= len(lines):
+    @staticmethod
+    def _line_texts(table: TextTable, line_indices: List[np.ndarray]) -> List[str]:
+        """Combined text of each line, with a space wherever the gap to the next fragment is > 5 px"""
+        if not line_indices:
             return []
         
-        # Check if next 3-5 lines are aligned (table-like)
-        candidate_rows = []
+        rows = np.concatenate(line_indices)
+        line_ends = np.cumsum([len(idx) for idx in line_indices])
         
-        for i in range(start_idx, min(start_idx + 20, len(lines))):
-            line = lines[i]
-            
-            if not candidate_rows:
-                # First row
-                candidate_rows.append(line)
-                continue
-            
-            # Check if this line is aligned with previous rows
-            if self._is_aligned_row(candidate_rows, line):
-                candidate_rows.append(line)
-            else:
-                # Not aligned - end of table
-                break
+        # More than 5 pixels gap = add space (never after a line's last fragment)
+        xs = table.x[rows]
+        spaced = np.zeros(len(rows), dtype=bool)
+        spaced[:-1] = xs[1:] - (xs[:-1] + table.w[rows[:-1]]) > 5
+        spaced[line_ends - 1] = False
         
-        # Return if we got at least 3 rows
-        return candidate_rows if len(candidate_rows) >= 3 else []
+        parts = [table.text[row] + " " if space else table.text[row]
+                 for row, space in zip(rows.tolist(), spaced.tolist())]
+        return ["".join(parts[start:stop]) for start, stop in zip([0, *line_ends[:-1].tolist()], line_ends.tolist())]
     
-    def _is_aligned_row(self, existing_rows: List[List[ExtractedText]], new_row: List[ExtractedText]) -> bool:
+    def _detect_tables(self, table: TextTable, line_indices: List[np.ndarray],
+                       line_bounds: List[Tuple] = None,
+                       line_texts: List[str] = None) -> List[List[TextBlock]]:
         """
-        Check if new_row aligns with existing table rows
+        Detect table structures (like switchboard schedules)
         
-        Alignment criteria:
-        - Similar number of columns (within 1)
-        - Similar x-coordinates for columns
+        Tables have:
+        - Multiple rows (3+)
+        - Aligned columns (x-coordinates similar)
+        - Consistent spacing
         """
-        if not existing_rows or not new_row:
-            return False
+        if len(line_indices) < 3:
+            return []
         
-        # Check column count similarity
-        avg_col_count = sum(len(row) for row in existing_rows) / len(existing_rows)
-        if abs(len(new_row) - avg_col_count) > 2:
-            return False
+        first_x = table.x[[idx[0] for idx in line_indices]]
+        col_counts = np.array([len(idx) for idx in line_indices], dtype=np.int64)
         
-        # Check x-alignment of first element
-        first_x_coords = [row[0].x for row in existing_rows]
-        avg_first_x = sum(first_x_coords) / len(first_x_coords)
+        # A table's second row must already match its first, so only lines
+        # aligned with the next one can start a table; pages with none skip the scan
+        can_start = np.zeros(len(line_indices), dtype=np.bool_)
+        can_start[:-1] = ((np.abs(np.diff(col_counts)) <= 2)
+                          & (np.abs(np.diff(first_x)) <= self.table_alignment_threshold))
+        if not can_start.any():
+            return []
         
-        if abs(new_row[0].x - avg_first_x) > self.table_alignment_threshold:
-            return False
+        tables = []
+        ranges = _table_ranges_kernel()(first_x, col_counts, can_start, self.table_alignment_threshold)
+        for start, stop in ranges.tolist():
+            # Convert to TextBlocks
+            table_blocks = []
+            for row_num, i in enumerate(range(start, stop)):
+                block = self._merge_line_into_block(
+                    table, line_indices[i],
+                    line_bounds[i] if line_bounds is not None else None,
+                    line_texts[i] if line_texts is not None else None)
+                block.is_table_row = True
+                block.row_number = row_num
+                table_blocks.append(block)
+            
+            tables.append(table_blocks)
         
-        return True
+        return tables
     
-    def _group_lines_into_blocks(self, lines: List[List[ExtractedText]], 
-                                  tables: List[List[TextBlock]]) -> List[TextBlock]:
+    def _group_lines_into_blocks(self, table: TextTable, line_indices: List[np.ndarray],
+                                  tables: List[List[TextBlock]],
+                                  line_bounds: List[Tuple] = None,
+                                  line_texts: List[str] = None) -> List[TextBlock]:
         """
         Group non-table lines into logical blocks
         
@@ -203,61 +335,48 @@ class SmartTextAssembler:
         """
         # Get table row indices to skip
         table_line_indices = set()
-        for table in tables:
-            for block in table:
+        for table_blocks in tables:
+            for block in table_blocks:
                 # Find which original lines compose this table
                 # (simplified - just skip detected tables for now)
                 pass
         
-        blocks = []
-        for line in lines:
+        blocks = [None] * len(line_indices)
+        for i, idx in enumerate(line_indices):
             # Skip if part of table (simplified check)
             # For now, just create a block for each line
-            block = self._merge_line_into_block(line)
-            blocks.append(block)
+            block = self._merge_line_into_block(
+                table, idx,
+                line_bounds[i] if line_bounds is not None else None,
+                line_texts[i] if line_texts is not None else None)
+            blocks[i] = block
         
         return blocks
     
-    def _merge_line_into_block(self, line: List[ExtractedText]) -> TextBlock:
+    def _merge_line_into_block(self, table: TextTable, idx: np.ndarray,
+                               bounds: Tuple = None, combined: str = None) -> TextBlock:
         """
-        Merge a list of text fragments on same line into one TextBlock
+        Merge the table rows idx (one line, left to right) into one TextBlock
         
-        Combines text with spaces, calculates bounding box
+        Combines text with spaces, calculates bounding box. bounds and
+        combined are the line's entries from _line_bounds/_line_texts,
+        computed here when not supplied.
         """
-        if not line:
+        if not len(idx):
             return None
         
-        # Sort left to right
-        line.sort(key=lambda t: t.x)
+        if bounds is None:
+            bounds = self._line_bounds(table, [idx])[0]
+        if combined is None:
+            combined = self._line_texts(table, [idx])[0]
         
-        # Combine text with smart spacing
-        combined_parts = []
-        for i, text in enumerate(line):
-            combined_parts.append(text.text)
-            
-            # Add space if next text is far enough away
-            if i < len(line) - 1:
-                next_text = line[i + 1]
-                gap = next_text.x - (text.x + text.width)
-                if gap > 5:  # More than 5 pixels gap = add space
-                    combined_parts.append(" ")
-        
-        combined = "".join(combined_parts)
-        
-        # Calculate bounding box
-        x = min(t.x for t in line)
-        y = min(t.y for t in line)
-        max_x = max(t.x + t.width for t in line)
-        max_y = max(t.y + t.height for t in line)
-        width = max_x - x
-        height = max_y - y
-        
-        # Average confidence
-        avg_confidence = sum(t.confidence for t in line) / len(line)
+        # Bounding box and average confidence
+        x, y, width, height, avg_confidence = bounds
         
         return TextBlock(
-            texts=line,
+            texts=[table.items[row] for row in idx.tolist()],
             combined_text=combined,
+            combined_upper=combined.upper(),
             x=x, y=y,
             width=width,
             height=height,
@@ -273,8 +392,6 @@ class SmartTextAssembler:
         - "600 kcmil" (wire sizes)
         - Panel designations
         """
-        import re
-        
         specs = {
             'switchboard_buckets': [],
             'wire_specs': [],
@@ -282,45 +399,33 @@ class SmartTextAssembler:
             'equipment_ratings': []
         }
         
-        for block in blocks:
-            text = block.combined_text
-            
-            # Pattern: Frame/Trip (e.g., "225AF / 110AT")
-            bucket_pattern = r'(\d+)\s*AF\s*/\s*(\d+)\s*(AT|AS|AE)'
-            matches = re.findall(bucket_pattern, text, re.IGNORECASE)
-            if matches:
-                for match in matches:
-                    frame, trip, trip_type = match
-                    specs['switchboard_buckets'].append({
-                        'text': text,
-                        'frame': frame,
-                        'trip': trip,
-                        'trip_type': trip_type,
-                        'location': (block.x, block.y)
-                    })
-            
-            # Pattern: Wire size with kcmil
-            wire_pattern = r'(\d+)\s*(?:kcmil|KCMIL|MCM)'
-            if re.search(wire_pattern, text, re.IGNORECASE):
-                specs['wire_specs'].append({
-                    'text': text,
-                    'location': (block.x, block.y)
-                })
-            
-            # Pattern: Panel labels
-            panel_pattern = r'(PP|LP|RP|DP|MDP)-?\d+'
-            if re.search(panel_pattern, text, re.IGNORECASE):
-                specs['panel_labels'].append({
-                    'text': text,
-                    'location': (block.x, block.y)
-                })
-            
-            # Pattern: Equipment ratings
-            rating_pattern = r'(\d+)\s*(?:A|AMP|KVA|HP|TON)'
-            if re.search(rating_pattern, text, re.IGNORECASE):
-                specs['equipment_ratings'].append({
-                    'text': text,
-                    'location': (block.x, block.y)
+        if not blocks:
+            return specs
+        
+        # One scan per pattern over all block texts joined together; match
+        # offsets map back to blocks through the start offset of each block
+        texts = [block.combined_text for block in blocks]
+        buffer = BLOCK_SEPARATOR.join(texts)
+        upper = BLOCK_SEPARATOR.join(block.combined_upper or block.combined_text.upper() for block in blocks)
+        starts = np.cumsum([0] + [len(text) + 1 for text in texts[:-1]])
+        
+        # Pattern: Frame/Trip (e.g., "225AF / 110AT")
+        for match, i in zip(*_match_blocks(BUCKET_RE, buffer, upper, starts)):
+            specs['switchboard_buckets'].append({
+                'text': texts[i],
+                **match.groupdict(),
+                'location': (blocks[i].x, blocks[i].y)
+            })
+        
+        # Wire size with kcmil, panel labels, equipment ratings: one entry per matching block
+        for key, pattern in (('wire_specs', WIRE_RE),
+                             ('panel_labels', PANEL_RE),
+                             ('equipment_ratings', RATING_RE)):
+            _, block_idx = _match_blocks(pattern, buffer, upper, starts)
+            for i in dict.fromkeys(block_idx):
+                specs[key].append({
+                    'text': texts[i],
+                    'location': (blocks[i].x, blocks[i].y)
                 })
         
         return specs
@@ -339,3 +444,23 @@ def assemble_drawing_text(texts: List[ExtractedText]) -> Tuple[List[TextBlock],
     specs = assembler.extract_equipment_specs(blocks)
     
     return blocks, specs
+
+
+def assemble_drawings_batch(pages: List[List[ExtractedText]], workers: int = None,
+                            chunksize: int = None) -> List[Tuple[List[TextBlock], Dict]]:
+    """
+    assemble_drawing_text for many pages (e.g. every sheet in a project) on a process pool
+    
+    The work is pure-Python grouping and regex, so threads would serialize on the GIL;
+    pages are shipped to worker processes in chunks to amortize pickling.
+    Returns (blocks, specs) per page in the order of pages.
+    """
+    workers = min(workers or os.cpu_count() or 1, len(pages))
+    if workers <= 1:
+        return [assemble_drawing_text(texts) for texts in pages]
+    
+    from concurrent.futures import ProcessPoolExecutor
+    
+    chunksize = chunksize or max(1, min(16, len(pages) // (workers * 4)))
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(assemble_drawing_text, pages, chunksize=chunksize))
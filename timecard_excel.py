@@ -3,13 +3,111 @@ Excel Exporter for Time Card Data
 Creates Excel file with separate FTE and Contractor sheets
 """
 
-from typing import List, Dict
+from typing import List, Dict, BinaryIO
 import io
+import operator
+import tempfile
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+try:
+    import openpyxl
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+    from openpyxl.utils import get_column_letter
+except ImportError:
+    openpyxl = None
+
+# Shared openpyxl styles - one instance each, so every cell that uses them
+# maps to the same entry in the workbook's style table
+if openpyxl is not None:
+    HEADER_FILL = PatternFill(start_color='366092', end_color='366092', fill_type='solid')
+    YELLOW_FILL = PatternFill(start_color='FFEB9C', end_color='FFEB9C', fill_type='solid')
+    RED_FILL = PatternFill(start_color='FFC7CE', end_color='FFC7CE', fill_type='solid')
+    SUMMARY_FILL = PatternFill(start_color='D9E1F2', end_color='D9E1F2', fill_type='solid')
+    HEADER_FONT = Font(bold=True, color='FFFFFF', size=11)
+    BOLD = Font(bold=True)
+    CENTER = Alignment(horizontal='center', vertical='center')
+    LEFT = Alignment(horizontal='left', vertical='center')
+    THIN_BORDER = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    # Per-column alignment (A..K): names and comments are left aligned
+    COLUMN_ALIGNMENTS = (CENTER, LEFT, CENTER, CENTER, CENTER, CENTER,
+                         CENTER, CENTER, CENTER, CENTER, LEFT)
+
+# Entry keys in sheet column order (A..K)
+ENTRY_KEYS = (
+    'employee_id',
+    'full_name',
+    'scope_id',
+    'po_number',
+    'po_line',
+    'time_in',
+    'time_out',
+    'lunch',
+    'shift',
+    'hours_worked',
+    'comments',
+)
+# entry dict -> tuple of its values in column order
+entry_values = operator.itemgetter(*ENTRY_KEYS)
+
+# Headers for columns B..K; column A is the ID column, named per sheet
+COLUMN_HEADERS = (
+    'Full Name',
+    'Scope ID',
+    'PO #',
+    'PO Line#',
+    'Time In',
+    'Time Out',
+    'Lunch',
+    'Day/Night Shift',
+    'Hours Worked',
+    'Comments',
+)
+# Widths for columns A..K
+COLUMN_WIDTHS = (18, 25, 12, 18, 12, 12, 12, 10, 15, 14, 30)
+
+
+# Exports larger than this spill from memory to a temp file on disk
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
 
 
 def create_timecard_excel(fte_entries: List[Dict], contractor_entries: List[Dict]) -> bytes:
+    """Create the timecard workbook and return it as bytes"""
+    
+    excel_buffer = io.BytesIO()
+    write_timecard_excel(fte_entries, contractor_entries, excel_buffer)
+    
+    return excel_buffer.getvalue()
+
+
+def create_timecard_excel_file(fte_entries: List[Dict], contractor_entries: List[Dict]) -> BinaryIO:
     """
-    Create Excel file with two sheets: FTE and Contractor
+    Create the timecard workbook in a SpooledTemporaryFile, rewound to the start.
+    The caller streams it out and closes it.
+    """
+    
+    excel_file = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    try:
+        write_timecard_excel(fte_entries, contractor_entries, excel_file)
+    except Exception:
+        excel_file.close()
+        raise
+    excel_file.seek(0)
+    
+    return excel_file
+
+
+def write_timecard_excel(fte_entries: List[Dict], contractor_entries: List[Dict], excel_file: BinaryIO):
+    """
+    Write Excel file with two sheets: FTE and Contractor
     
     Columns:
     - Vendor/Tesla Employee ID
@@ -23,20 +121,20 @@ def create_timecard_excel(fte_entries: List[Dict], contractor_entries: List[Dict
     - Day/Night Shift
     - Hours Worked
     - Comments
+
+    Uses xlsxwriter when it is installed (much faster on large exports),
+    otherwise falls back to openpyxl.
     """
     
-    try:
-        import openpyxl
-        from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-    except ImportError:
-        raise ImportError("openpyxl not installed - required for Excel export")
+    if xlsxwriter is not None:
+        write_timecard_excel_xlsxwriter(fte_entries, contractor_entries, excel_file)
+        return
     
-    # Create workbook
-    wb = openpyxl.Workbook()
+    if openpyxl is None:
+        raise ImportError("openpyxl not installed - required for Excel export")
     
-    # Remove default sheet
-    if 'Sheet' in wb.sheetnames:
-        wb.remove(wb['Sheet'])
+    # Write-only workbook: rows are streamed out as they are appended
+    wb = openpyxl.Workbook(write_only=True)
     
     # Create FTE sheet
     ws_fte = wb.create_sheet('FTE')
@@ -46,159 +144,173 @@ def create_timecard_excel(fte_entries: List[Dict], contractor_entries: List[Dict
     ws_contractor = wb.create_sheet('Contractor')
     setup_timecard_sheet(ws_contractor, contractor_entries, 'Vendor Employee ID')
     
-    # Save to bytes
-    excel_buffer = io.BytesIO()
-    wb.save(excel_buffer)
-    excel_buffer.seek(0)
-    
-    return excel_buffer.getvalue()
+    wb.save(excel_file)
+
+
+def _styled_cell(ws, value, alignment=None, fill=None, font=None, number_format=None, border=True):
+    """Build a WriteOnlyCell carrying the shared styles"""
+    cell = WriteOnlyCell(ws, value=value)
+    if alignment is not None:
+        cell.alignment = alignment
+    if border:
+        cell.border = THIN_BORDER
+    if fill is not None:
+        cell.fill = fill
+    if font is not None:
+        cell.font = font
+    if number_format is not None:
+        cell.number_format = number_format
+    return cell
 
 
 def setup_timecard_sheet(ws, entries: List[Dict], id_column_name: str):
-    """Setup worksheet with headers and data"""
+    """Setup write-only worksheet with headers and data (rows are appended in order)"""
     
-    from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-    
-    # Headers
-    headers = [
-        id_column_name,
-        'Full Name',
-        'Scope ID',
-        'PO #',
-        'PO Line#',
-        'Time In',
-        'Time Out',
-        'Lunch',
-        'Day/Night Shift',
-        'Hours Worked',
-        'Comments'
-    ]
-    
-    # Style for headers
-    header_fill = PatternFill(start_color='366092', end_color='366092', fill_type='solid')
-    header_font = Font(bold=True, color='FFFFFF', size=11)
-    header_alignment = Alignment(horizontal='center', vertical='center')
-    
-    thin_border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-    
-    # Write headers
-    for col_idx, header in enumerate(headers, start=1):
-        cell = ws.cell(row=1, column=col_idx, value=header)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = header_alignment
-        cell.border = thin_border
+    headers = (id_column_name,) + COLUMN_HEADERS
     
     # Set column widths
-    column_widths = {
-        'A': 18,  # ID
-        'B': 25,  # Full Name
-        'C': 12,  # Scope ID
-        'D': 18,  # PO #
-        'E': 12,  # PO Line#
-        'F': 12,  # Time In
-        'G': 12,  # Time Out
-        'H': 10,  # Lunch
-        'I': 15,  # Shift
-        'J': 14,  # Hours Worked
-        'K': 30   # Comments
-    }
-    
-    for col, width in column_widths.items():
-        ws.column_dimensions[col].width = width
+    for col_idx, width in enumerate(COLUMN_WIDTHS, start=1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = width
     
     # Freeze top row
     ws.freeze_panes = 'A2'
     
+    # Write headers
+    ws.append([_styled_cell(ws, header, CENTER, HEADER_FILL, HEADER_FONT) for header in headers])
+    
     # Write data rows
-    for row_idx, entry in enumerate(entries, start=2):
-        # Data alignment
-        center_align = Alignment(horizontal='center', vertical='center')
-        left_align = Alignment(horizontal='left', vertical='center')
-        
-        # Employee ID
-        cell = ws.cell(row=row_idx, column=1, value=entry['employee_id'])
-        cell.alignment = center_align
-        cell.border = thin_border
-        
-        # Full Name
-        cell = ws.cell(row=row_idx, column=2, value=entry['full_name'])
-        cell.alignment = left_align
-        cell.border = thin_border
-        
-        # Scope ID
-        cell = ws.cell(row=row_idx, column=3, value=entry['scope_id'])
-        cell.alignment = center_align
-        cell.border = thin_border
+    # Total hours are accumulated while the rows are written
+    total_hours = 0.0
+    for entry in entries:
+        values = list(entry_values(entry))
+        time_in, time_out, hours_worked, comments = values[5], values[6], values[9], values[10]
         
-        # PO #
-        cell = ws.cell(row=row_idx, column=4, value=entry['po_number'])
-        cell.alignment = center_align
-        cell.border = thin_border
+        # Highlight if hours are unusual
+        hours_fill = None
+        if hours_worked:
+            hours_float = float(hours_worked)
+            total_hours += hours_float
+            if hours_float > 12 or hours_float < 1:
+                hours_fill = RED_FILL
+        else:
+            values[9] = '0.00'
         
-        # PO Line#
-        cell = ws.cell(row=row_idx, column=5, value=entry['po_line'])
-        cell.alignment = center_align
-        cell.border = thin_border
+        row = [_styled_cell(ws, value, alignment)
+               for value, alignment in zip(values, COLUMN_ALIGNMENTS)]
         
-        # Time In
-        cell = ws.cell(row=row_idx, column=6, value=entry['time_in'])
-        cell.alignment = center_align
-        cell.border = thin_border
-        if not entry['time_in']:
-            cell.fill = PatternFill(start_color='FFEB9C', end_color='FFEB9C', fill_type='solid')
+        # Highlights
+        if not time_in:
+            row[5].fill = YELLOW_FILL
+        if not time_out:
+            row[6].fill = YELLOW_FILL
+        row[9].number_format = '0.00'
+        if hours_fill is not None:
+            row[9].fill = hours_fill
+        if comments:
+            row[10].fill = YELLOW_FILL
         
-        # Time Out
-        cell = ws.cell(row=row_idx, column=7, value=entry['time_out'])
-        cell.alignment = center_align
-        cell.border = thin_border
-        if not entry['time_out']:
-            cell.fill = PatternFill(start_color='FFEB9C', end_color='FFEB9C', fill_type='solid')
+        ws.append(row)
+    
+    # Add summary row at bottom, after one blank row
+    if entries:
+        ws.append([])
         
-        # Lunch
-        cell = ws.cell(row=row_idx, column=8, value=entry['lunch'])
-        cell.alignment = center_align
-        cell.border = thin_border
+        summary = [None] * 10
+        summary[0] = _styled_cell(ws, 'TOTAL HOURS:', font=BOLD, border=False)
+        summary[9] = _styled_cell(ws, total_hours, fill=SUMMARY_FILL, font=BOLD,
+                                  number_format='0.00', border=False)
+        ws.append(summary)
+
+
+def write_timecard_excel_xlsxwriter(fte_entries: List[Dict], contractor_entries: List[Dict], excel_file: BinaryIO):
+    """Same workbook as write_timecard_excel, written with xlsxwriter"""
+    
+    # constant_memory streams each row to a temp file as it is written; xlsxwriter
+    # silently turns it off when in_memory is set, so in_memory must stay unset
+    wb = xlsxwriter.Workbook(excel_file, {'constant_memory': True})
+    
+    # Formats are created once per workbook and shared by every cell
+    border = {'border': 1}
+    center = {'align': 'center', 'valign': 'vcenter', **border}
+    left = {'align': 'left', 'valign': 'vcenter', **border}
+    yellow = {'bg_color': '#FFEB9C', 'pattern': 1}
+    hours = {**center, 'num_format': '0.00'}
+    formats = {
+        'header': wb.add_format({**center, 'bold': True, 'font_color': '#FFFFFF',
+                                 'font_size': 11, 'bg_color': '#366092', 'pattern': 1}),
+        'center': wb.add_format(center),
+        'left': wb.add_format(left),
+        'center_yellow': wb.add_format({**center, **yellow}),
+        'left_yellow': wb.add_format({**left, **yellow}),
+        'hours': wb.add_format(hours),
+        'hours_red': wb.add_format({**hours, 'bg_color': '#FFC7CE', 'pattern': 1}),
+        'bold': wb.add_format({'bold': True}),
+        'total': wb.add_format({'bold': True, 'num_format': '0.00',
+                                'bg_color': '#D9E1F2', 'pattern': 1}),
+    }
+    
+    setup_timecard_sheet_xlsxwriter(wb.add_worksheet('FTE'), fte_entries,
+                                    'Tesla Employee ID', formats)
+    setup_timecard_sheet_xlsxwriter(wb.add_worksheet('Contractor'), contractor_entries,
+                                    'Vendor Employee ID', formats)
+    
+    wb.close()
+
+
+def setup_timecard_sheet_xlsxwriter(ws, entries: List[Dict], id_column_name: str, formats: Dict):
+    """Setup xlsxwriter worksheet with headers and data (rows must be written in order)"""
+    
+    headers = (id_column_name,) + COLUMN_HEADERS
+    
+    # Column widths A..K
+    for col, width in enumerate(COLUMN_WIDTHS):
+        ws.set_column(col, col, width)
+    
+    # Freeze top row
+    ws.freeze_panes(1, 0)
+    
+    ws.write_row(0, 0, headers, formats['header'])
+    
+    center = formats['center']
+    left = formats['left']
+    center_yellow = formats['center_yellow']
+    left_yellow = formats['left_yellow']
+    hours_normal = formats['hours']
+    hours_red = formats['hours_red']
+    
+    # Write data rows; the base format covers most cells, highlighted cells are
+    # overwritten before the row is flushed
+    # Total hours are accumulated while the rows are written
+    total_hours = 0.0
+    for row_idx, entry in enumerate(entries, start=1):
+        values = entry_values(entry)
+        full_name, time_in, time_out, hours_worked, comments = (
+            values[1], values[5], values[6], values[9], values[10])
         
-        # Shift
-        cell = ws.cell(row=row_idx, column=9, value=entry['shift'])
-        cell.alignment = center_align
-        cell.border = thin_border
+        ws.write_row(row_idx, 0, values, center)
+        ws.write(row_idx, 1, full_name, left)
         
-        # Hours Worked
-        hours_val = entry['hours_worked'] if entry['hours_worked'] else '0.00'
-        cell = ws.cell(row=row_idx, column=10, value=hours_val)
-        cell.alignment = center_align
-        cell.border = thin_border
-        cell.number_format = '0.00'
+        if not time_in:
+            ws.write(row_idx, 5, time_in, center_yellow)
+        if not time_out:
+            ws.write(row_idx, 6, time_out, center_yellow)
         
-        # Highlight if hours are unusual
-        if entry['hours_worked']:
-            hours_float = float(entry['hours_worked'])
+        # Hours Worked, highlighted if unusual
+        hours_fmt = hours_normal
+        if hours_worked:
+            hours_float = float(hours_worked)
+            total_hours += hours_float
             if hours_float > 12 or hours_float < 1:
-                cell.fill = PatternFill(start_color='FFC7CE', end_color='FFC7CE', fill_type='solid')
+                hours_fmt = hours_red
+        ws.write(row_idx, 9, hours_worked or '0.00', hours_fmt)
         
         # Comments
-        cell = ws.cell(row=row_idx, column=11, value=entry['comments'])
-        cell.alignment = left_align
-        cell.border = thin_border
-        if entry['comments']:
-            cell.fill = PatternFill(start_color='FFEB9C', end_color='FFEB9C', fill_type='solid')
+        ws.write(row_idx, 10, comments, left_yellow if comments else left)
     
     # Add summary row at bottom
     if entries:
-        summary_row = len(entries) + 3
+        summary_row = len(entries) + 2
         
-        ws.cell(row=summary_row, column=1, value='TOTAL HOURS:').font = Font(bold=True)
+        ws.write(summary_row, 0, 'TOTAL HOURS:', formats['bold'])
         
-        # Sum hours
-        total_hours = sum(float(e['hours_worked']) if e['hours_worked'] else 0 for e in entries)
-        cell = ws.cell(row=summary_row, column=10, value=total_hours)
-        cell.font = Font(bold=True)
-        cell.number_format = '0.00'
-        cell.fill = PatternFill(start_color='D9E1F2', end_color='D9E1F2', fill_type='solid')
+        ws.write_number(summary_row, 9, total_hours, formats['total'])
@@ -3,34 +3,92 @@ Time Card Scanner - Extract employee hours from time card images
 Supports both FTE (Tesla Employee ID) and Contractor (Vendor Employee ID) sheets
 """
 
+import logging
 import re
 from typing import List, Dict, Optional
 from datetime import datetime
 import io
 
 
+logger = logging.getLogger(__name__)
+
+# Compiled once at import; used on every OCR line
+HOURS_RE = re.compile(r'(\d+\.?\d*)')
+EMPLOYEE_ID_RE = re.compile(r'(\d{6,9})')
+NAME_RE = re.compile(r'^([A-Za-z\s\.\-\']{3,40})')
+TIME_SEPARATED_RE = re.compile(r'(\d{1,2})[:\.](\d{2})')
+TIME_DIGITS_RE = re.compile(r'(\d{3,4})')
+TIME_24H_RE = re.compile(r'(\d{1,2}):(\d{2})')
+# The FTE sheet header; anything else is treated as a contractor sheet
+FTE_SHEET_RE = re.compile(r'TESLA EMPLOYEE ID', re.IGNORECASE)
+# Header row keywords, matched against the upper-cased line
+HEADER_RE = re.compile(r'EMPLOYEE ID|FULL NAME|TIME IN|TIME OUT|VENDOR|TESLA')
+
+# Review flags as an int bitmask (see entry_flags); computed from the entry's
+# current values each time, so they stay right after hours or times are edited
+FLAG_HOURS_HIGH = 1      # hours_worked > 12
+FLAG_HOURS_LOW = 2       # hours_worked < 1
+FLAG_MISSING_TIMES = 4   # time_in or time_out missing
+
+
+def entry_flags(entry: Dict) -> int:
+    """Review flag bitmask for a time entry (see FLAG_*)"""
+    flags = 0
+    if not entry['time_in'] or not entry['time_out']:
+        flags |= FLAG_MISSING_TIMES
+    if entry['hours_worked']:
+        hours = float(entry['hours_worked'])
+        if hours > 12:
+            flags |= FLAG_HOURS_HIGH
+        elif hours < 1:
+            flags |= FLAG_HOURS_LOW
+    return flags
+
+
+# str.translate tables that delete every ASCII character except digits /
+# letters and whitespace
+_ASCII = ''.join(map(chr, range(128)))
+_DROP_NON_DIGITS = str.maketrans('', '', ''.join(c for c in _ASCII if not c.isdigit()))
+_DROP_NON_LETTERS = str.maketrans('', '', ''.join(c for c in _ASCII if not (c.isalpha() or c.isspace())))
+
+
+def _keep_digits(text: str) -> str:
+    """Drop everything but digits (translate in C for ASCII, per char otherwise)"""
+    if text.isascii():
+        return text.translate(_DROP_NON_DIGITS)
+    return ''.join(filter(str.isdigit, text))
+
+
+def _keep_letters(text: str) -> str:
+    """Drop everything but letters and whitespace"""
+    if text.isascii():
+        return text.translate(_DROP_NON_LETTERS)
+    return ''.join(c for c in text if c.isalpha() or c.isspace())
+
+
 class TimeCardScanner:
     """Extract employee time data from scanned time cards"""
     
-    def __init__(self):
-        self.default_scope_id = "64437"
-        self.default_po_number = "PO #5100837069"
-        self.default_po_line = "110"
-        self.default_lunch = "0.50"
-        self.default_shift = "Day"
+    # Stateless: the defaults are shared class constants, so instances carry
+    # no __dict__
+    __slots__ = ()
+    
+    DEFAULT_SCOPE_ID = "64437"
+    DEFAULT_PO_NUMBER = "PO #5100837069"
+    DEFAULT_PO_LINE = "110"
+    DEFAULT_LUNCH = "0.50"
+    DEFAULT_SHIFT = "Day"
     
     def detect_sheet_type(self, text: str) -> str:
         """
         Determine if this is an FTE or Contractor time sheet
         Returns: 'FTE' or 'Contractor'
         """
-        if "Tesla Employee ID" in text or "TESLA EMPLOYEE ID" in text:
+        # Vendor Employee ID sheets and unclear sheets are both Contractor,
+        # so only the FTE header needs a scan
+        if FTE_SHEET_RE.search(text):
             return "FTE"
-        elif "Vendor Employee ID" in text or "VENDOR EMPLOYEE ID" in text:
-            return "Contractor"
-        else:
-            # Default to Contractor if unclear
-            return "Contractor"
+        return "Contractor"
     
     def extract_time_entries(self, text: str) -> List[Dict]:
         """
@@ -41,86 +99,105 @@ class TimeCardScanner:
         entries = []
         lines = text.split('\n')
         
-        print(f"[SCANNER] Processing {len(lines)} lines")
+        # Checked once per call so per-line messages are never formatted
+        # unless debug logging is on
+        debug = logger.isEnabledFor(logging.DEBUG)
+        
+        if debug:
+            logger.debug(f"Processing {len(lines)} lines")
         
         for line_num, line in enumerate(lines, 1):
             line = line.strip()
             if not line or len(line) < 10:
                 continue
             
-            print(f"[SCANNER] Line {line_num}: {line[:100]}")  # First 100 chars
+            if debug:
+                logger.debug(f"Line {line_num}: {line[:100]}")
             
             # Skip header rows
-            if any(header in line.upper() for header in ['EMPLOYEE ID', 'FULL NAME', 'TIME IN', 'TIME OUT', 'VENDOR', 'TESLA']):
-                print(f"[SCANNER] Line {line_num}: SKIPPED (header)")
+            if HEADER_RE.search(line.upper()):
+                if debug:
+                    logger.debug(f"Line {line_num}: SKIPPED (header)")
                 continue
             
             # Check if line has pipe delimiters (table format)
             if '|' in line:
-                print(f"[SCANNER] Line {line_num}: Has pipes, splitting...")
+                if debug:
+                    logger.debug(f"Line {line_num}: Has pipes, splitting...")
                 parts = [p.strip() for p in line.split('|')]
-                print(f"[SCANNER] Line {line_num}: Split into {len(parts)} parts: {parts}")
+                if debug:
+                    logger.debug(f"Line {line_num}: Split into {len(parts)} parts: {parts}")
                 
                 # Need at least ID and Name
                 if len(parts) < 2:
-                    print(f"[SCANNER] Line {line_num}: SKIPPED (not enough parts)")
+                    if debug:
+                        logger.debug(f"Line {line_num}: SKIPPED (not enough parts)")
                     continue
                 
                 # Column 1: Employee ID (clean to digits only)
-                employee_id = ''.join(filter(str.isdigit, parts[0]))
-                print(f"[SCANNER] Line {line_num}: Employee ID = '{employee_id}'")
+                employee_id = _keep_digits(parts[0])
+                if debug:
+                    logger.debug(f"Line {line_num}: Employee ID = '{employee_id}'")
                 
                 if len(employee_id) < 6:
-                    print(f"[SCANNER] Line {line_num}: SKIPPED (ID too short)")
+                    if debug:
+                        logger.debug(f"Line {line_num}: SKIPPED (ID too short)")
                     continue
                 
                 # Column 2: Full Name (clean to letters/spaces only)
-                full_name = ''.join(c for c in parts[1] if c.isalpha() or c.isspace()).strip()
-                print(f"[SCANNER] Line {line_num}: Full Name = '{full_name}'")
+                full_name = _keep_letters(parts[1]).strip()
+                if debug:
+                    logger.debug(f"Line {line_num}: Full Name = '{full_name}'")
                 
                 if len(full_name) < 3:
-                    print(f"[SCANNER] Line {line_num}: SKIPPED (name too short)")
+                    if debug:
+                        logger.debug(f"Line {line_num}: SKIPPED (name too short)")
                     continue
                 
                 # Column 3: Time In (if present)
                 time_in = ""
                 if len(parts) > 2:
                     time_in = self.extract_time_from_text(parts[2])
-                    print(f"[SCANNER] Line {line_num}: Time In = '{time_in}'")
+                    if debug:
+                        logger.debug(f"Line {line_num}: Time In = '{time_in}'")
                 
                 # Column 4: Time Out (if present)
                 time_out = ""
                 if len(parts) > 3:
                     time_out = self.extract_time_from_text(parts[3])
-                    print(f"[SCANNER] Line {line_num}: Time Out = '{time_out}'")
+                    if debug:
+                        logger.debug(f"Line {line_num}: Time Out = '{time_out}'")
                 
                 # Column 5: Meal (extract number)
-                lunch = self.default_lunch
+                lunch = self.DEFAULT_LUNCH
                 if len(parts) > 4:
-                    meal_digits = ''.join(filter(str.isdigit, parts[4]))
+                    meal_digits = _keep_digits(parts[4])
                     if meal_digits:
                         meal_val = int(meal_digits)
                         if meal_val > 2:  # Minutes
                             lunch = f"{meal_val / 60:.2f}"
                         else:
                             lunch = "0.50"
-                    print(f"[SCANNER] Line {line_num}: Lunch = '{lunch}'")
+                    if debug:
+                        logger.debug(f"Line {line_num}: Lunch = '{lunch}'")
                 
                 # Column 6: Shift (Day/Night)
-                shift = self.default_shift
+                shift = self.DEFAULT_SHIFT
                 if len(parts) > 5:
                     if 'NIGHT' in parts[5].upper() or 'N' in parts[5].upper():
                         shift = "Night"
-                    print(f"[SCANNER] Line {line_num}: Shift = '{shift}'")
+                    if debug:
+                        logger.debug(f"Line {line_num}: Shift = '{shift}'")
                 
                 # Column 7: Total Hours
                 hours_worked = ""
                 if len(parts) > 6:
                     hours_text = parts[6]
-                    hours_match = re.search(r'(\d+\.?\d*)', hours_text)
+                    hours_match = HOURS_RE.search(hours_text)
                     if hours_match:
                         hours_worked = f"{float(hours_match.group(1)):.2f}"
-                    print(f"[SCANNER] Line {line_num}: Hours = '{hours_worked}'")
+                    if debug:
+                        logger.debug(f"Line {line_num}: Hours = '{hours_worked}'")
                 
                 # Calculate if not provided
                 if not hours_worked and time_in and time_out:
@@ -129,23 +206,27 @@ class TimeCardScanner:
                     except:
                         pass
                 
-                print(f"[SCANNER] Line {line_num}: EXTRACTED ENTRY")
+                if debug:
+                    logger.debug(f"Line {line_num}: EXTRACTED ENTRY")
                 
             else:
-                print(f"[SCANNER] Line {line_num}: No pipes, trying fallback pattern")
+                if debug:
+                    logger.debug(f"Line {line_num}: No pipes, trying fallback pattern")
                 # Fallback: Try original pattern matching for non-table format
-                id_match = re.search(r'(\d{6,9})', line)
+                id_match = EMPLOYEE_ID_RE.search(line)
                 if not id_match:
-                    print(f"[SCANNER] Line {line_num}: SKIPPED (no ID match)")
+                    if debug:
+                        logger.debug(f"Line {line_num}: SKIPPED (no ID match)")
                     continue
                 
                 employee_id = id_match.group(1)
                 remaining = line.replace(employee_id, '', 1).strip()
                 
                 # Extract name
-                name_match = re.search(r'^([A-Za-z\s\.\-\']{3,40})', remaining)
+                name_match = NAME_RE.search(remaining)
                 if not name_match:
-                    print(f"[SCANNER] Line {line_num}: SKIPPED (no name match)")
+                    if debug:
+                        logger.debug(f"Line {line_num}: SKIPPED (no name match)")
                     continue
                 
                 full_name = name_match.group(1).strip()
@@ -156,19 +237,20 @@ class TimeCardScanner:
                 remaining = remaining.replace(time_in, '', 1) if time_in else remaining
                 time_out = self.extract_time_from_text(remaining)
                 
-                lunch = self.default_lunch
-                shift = self.default_shift
+                lunch = self.DEFAULT_LUNCH
+                shift = self.DEFAULT_SHIFT
                 hours_worked = ""
                 
-                print(f"[SCANNER] Line {line_num}: EXTRACTED ENTRY (fallback)")
+                if debug:
+                    logger.debug(f"Line {line_num}: EXTRACTED ENTRY (fallback)")
             
             # Build entry
             entry = {
                 'employee_id': employee_id,
                 'full_name': full_name.title(),
-                'scope_id': self.default_scope_id,
-                'po_number': self.default_po_number,
-                'po_line': self.default_po_line,
+                'scope_id': self.DEFAULT_SCOPE_ID,
+                'po_number': self.DEFAULT_PO_NUMBER,
+                'po_line': self.DEFAULT_PO_LINE,
                 'time_in': time_in,
                 'time_out': time_out,
                 'lunch': lunch,
@@ -179,14 +261,16 @@ class TimeCardScanner:
             }
             
             # Flag for review
+            flag_bits = entry_flags(entry)
+            
             flags = []
-            if not time_in or not time_out:
+            if flag_bits & FLAG_MISSING_TIMES:
                 flags.append("REVIEW: Missing times")
             if not hours_worked:
                 flags.append("REVIEW: No hours calculated")
-            elif float(hours_worked) > 12:
+            elif flag_bits & FLAG_HOURS_HIGH:
                 flags.append("REVIEW: Hours >12")
-            elif float(hours_worked) < 1:
+            elif flag_bits & FLAG_HOURS_LOW:
                 flags.append("REVIEW: Hours <1")
             
             if flags:
@@ -194,7 +278,8 @@ class TimeCardScanner:
             
             entries.append(entry)
         
-        print(f"[SCANNER] Total entries extracted: {len(entries)}")
+        if debug:
+            logger.debug(f"Total entries extracted: {len(entries)}")
         return entries
     
     def extract_time_from_text(self, text: str) -> str:
@@ -205,16 +290,25 @@ class TimeCardScanner:
         if not text:
             return ""
         
+        # Fast path for the common clean "H:MM" / "HH:MM" cell. Only taken when
+        # no '.' precedes the colon, so it finds the same match as pattern 1
+        head, colon, tail = text.partition(':')
+        if colon and '.' not in head:
+            hours_text = head[-2:]
+            minutes_text = tail[:2]
+            if hours_text.isdecimal() and len(minutes_text) == 2 and minutes_text.isdecimal():
+                return self.format_time(int(hours_text), int(minutes_text))
+        
         # Look for time patterns
         # Pattern 1: HH:MM format
-        match = re.search(r'(\d{1,2})[:\.](\d{2})', text)
+        match = TIME_SEPARATED_RE.search(text)
         if match:
             hours = int(match.group(1))
             minutes = int(match.group(2))
             return self.format_time(hours, minutes)
         
         # Pattern 2: HHMM or HMM (no separator)
-        match = re.search(r'(\d{3,4})', text)
+        match = TIME_DIGITS_RE.search(text)
         if match:
             time_str = match.group(1)
             if len(time_str) == 4:  # HHMM
@@ -237,126 +331,6 @@ class TimeCardScanner:
             return f"12:{minutes:02d} PM"
         else:
             return f"{hours-12}:{minutes:02d} PM"
-        """
-        Extract individual employee time entries from OCR text
-        
-        Format expectations:
-        - Column 1: ID # (6-9 digits) - TYPED
-        - Column 2: Full Name - TYPED  
-        - Column 3: Start Time - HANDWRITTEN (may be unclear)
-        - Column 4: End Time - HANDWRITTEN (may be unclear)
-        - Column 5: Meal Break - HANDWRITTEN (may be unclear)
-        - Column 6: Signature - ignore
-        - Column 7: Total Hours - HANDWRITTEN (may be unclear)
-        
-        Strategy: Extract typed names reliably, attempt times, flag unclear entries
-        """
-        
-        entries = []
-        lines = text.split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            if not line or len(line) < 10:
-                continue
-            
-            # Skip header rows
-            if any(header in line.upper() for header in ['EMPLOYEE ID', 'FULL NAME', 'START TIME', 'TIME IN', 'COLUMN']):
-                continue
-            
-            # Extract employee ID (6-9 digit number at start) - TYPED = RELIABLE
-            id_match = re.search(r'^(\d{6,9})', line)
-            if not id_match:
-                continue
-            
-            employee_id = id_match.group(1)
-            remaining_text = line[len(employee_id):].strip()
-            
-            # Extract full name (typed text before time patterns) - TYPED = RELIABLE
-            # Names are words/letters before any time patterns or numbers
-            name_match = re.search(r'^([A-Za-z\s\.\-\']+?)(?=\d{1,2}[:\.]?\d{0,2}|\d{1,2}\s*[AP]M|$)', remaining_text)
-            full_name = name_match.group(1).strip() if name_match else ""
-            
-            if not full_name or len(full_name) < 3:
-                continue
-            
-            # Now look for handwritten times - these may be unclear
-            # Look for patterns like: 5:00, 530, 5 00, 5:30 AM, 1:30 PM
-            time_pattern = r'(\d{1,2}[:\.\s]?\d{0,2}\s*(?:AM|PM|am|pm)?)'
-            times = re.findall(time_pattern, remaining_text, re.IGNORECASE)
-            
-            # Try to extract times, but flag if unclear
-            time_in = ""
-            time_out = ""
-            confidence_low = False
-            
-            if len(times) >= 2:
-                time_in = self.normalize_time(times[0])
-                time_out = self.normalize_time(times[1])
-            else:
-                confidence_low = True
-            
-            # Extract meal break - look for decimal like 0.5, 0.50, or whole number like 30
-            meal_match = re.search(r'(\d+\.?\d*)', remaining_text)
-            lunch = self.default_lunch
-            if meal_match:
-                meal_value = float(meal_match.group(1))
-                if meal_value > 2:  # Assume minutes
-                    lunch = f"{meal_value / 60:.2f}"
-                else:
-                    lunch = f"{meal_value:.2f}"
-            
-            # Try to extract total hours if present
-            # Usually at end of line, decimal number
-            hours_match = re.search(r'(\d{1,2}\.\d{1,2})$', remaining_text)
-            hours_worked = hours_match.group(1) if hours_match else ""
-            
-            # If we have both times, calculate hours
-            if time_in and time_out and not hours_worked:
-                try:
-                    hours_worked = self.calculate_hours(time_in, time_out, float(lunch))
-                except:
-                    confidence_low = True
-            
-            # Build entry
-            entry = {
-                'employee_id': employee_id,
-                'full_name': full_name.title(),
-                'scope_id': self.default_scope_id,
-                'po_number': self.default_po_number,
-                'po_line': self.default_po_line,
-                'time_in': time_in,
-                'time_out': time_out,
-                'lunch': lunch,
-                'shift': self.default_shift,
-                'hours_worked': hours_worked,
-                'comments': '',
-                'has_signature': True  # Assume signed
-            }
-            
-            # Flag entries that need review
-            flags = []
-            
-            if not time_in or not time_out:
-                flags.append("REVIEW: Missing times")
-                confidence_low = True
-            
-            if confidence_low:
-                flags.append("REVIEW: OCR unclear")
-            
-            if hours_worked:
-                hours_float = float(hours_worked) if hours_worked else 0
-                if hours_float > 12:
-                    flags.append("REVIEW: Hours >12")
-                if hours_float < 1:
-                    flags.append("REVIEW: Hours <1")
-            
-            if flags:
-                entry['comments'] = "; ".join(flags)
-            
-            entries.append(entry)
-        
-        return entries
     
     def normalize_time(self, time_str: str) -> str:
         """
@@ -406,8 +380,6 @@ class TimeCardScanner:
             suffix = "PM" if has_pm else "AM"
         
         return f"{hours}:{minutes:02d} {suffix}"
-        
-        return entries
     
     def calculate_hours(self, start_time: str, end_time: str, lunch_hours: float = 0.5) -> str:
         """
@@ -433,7 +405,7 @@ class TimeCardScanner:
             
             return f"{worked_hours:.2f}"
         except Exception as e:
-            print(f"Error calculating hours: {e}")
+            logger.warning("Error calculating hours: %s", e)
             return ""
     
     def parse_time(self, time_str: str) -> int:
@@ -449,7 +421,7 @@ class TimeCardScanner:
         is_am = 'AM' in time_str
         
         # Extract HH:MM
-        time_match = re.search(r'(\d{1,2}):(\d{2})', time_str)
+        time_match = TIME_24H_RE.search(time_str)
         if not time_match:
             raise ValueError(f"Invalid time format: {time_str}")
         
@@ -470,10 +442,22 @@ class TimeCardScanner:
         Returns: validation summary with counts and issues
         """
         total_entries = len(entries)
-        missing_times = sum(1 for e in entries if not e['time_in'] or not e['time_out'])
-        missing_signatures = sum(1 for e in entries if not e['has_signature'])
-        excessive_hours = sum(1 for e in entries if e['hours_worked'] and float(e['hours_worked']) > 12)
-        low_hours = sum(1 for e in entries if e['hours_worked'] and float(e['hours_worked']) < 1)
+        missing_times = 0
+        missing_signatures = 0
+        excessive_hours = 0
+        low_hours = 0
+        
+        # One pass over the entries, as edited
+        for e in entries:
+            flags = entry_flags(e)
+            if flags & FLAG_MISSING_TIMES:
+                missing_times += 1
+            if not e['has_signature']:
+                missing_signatures += 1
+            if flags & FLAG_HOURS_HIGH:
+                excessive_hours += 1
+            elif flags & FLAG_HOURS_LOW:
+                low_hours += 1
         
         return {
             'total_entries': total_entries,